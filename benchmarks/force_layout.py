@@ -0,0 +1,38 @@
+"""times `forcelayout.get_layout` on random graphs of increasing size.
+
+usage: `python benchmarks/force_layout.py [node count ...]`
+
+each graph has two edges per node, between nodes that are near each other in
+number (so the layout has structure to find). graphs at or below
+`forcelayout.EXACT_CHARGE_LIMIT` nodes use the exact charge force; larger
+ones use the grid.
+"""
+from pathlib import Path
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'webweb'))
+
+import forcelayout
+
+
+def make_edges(node_count):
+    rng = np.random.default_rng(0)
+    source = rng.integers(0, node_count, 2 * node_count)
+    target = (source + rng.integers(1, 30, 2 * node_count)) % node_count
+    return source, target
+
+
+if __name__ == '__main__':
+    node_counts = [int(arg) for arg in sys.argv[1:]] or [500, 5000, 50000]
+
+    for node_count in node_counts:
+        source, target = make_edges(node_count)
+
+        start = time.perf_counter()
+        forcelayout.get_layout(source, target, node_count)
+        elapsed = time.perf_counter() - start
+
+        print("{:>8} nodes{:>8.2f}s".format(node_count, elapsed))
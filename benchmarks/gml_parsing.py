@@ -0,0 +1,66 @@
+"""times parsing a gml file with pygmlion's token and line parsers, and
+streaming it with `iter_gml`.
+
+usage: `python benchmarks/gml_parsing.py [edge count]`
+
+the file is a single graph with a labeled node for every tenth edge and a
+weighted edge list, written to a temporary directory. the line parser is
+quadratic, so keep the edge count modest.
+"""
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'webweb'))
+
+import pygmlion
+
+
+def write_gml(path, edge_count):
+    rng = np.random.default_rng(0)
+    node_count = max(edge_count // 10, 1)
+
+    source = rng.integers(0, node_count, edge_count)
+    target = rng.integers(0, node_count, edge_count)
+    weight = rng.random(edge_count)
+
+    with open(path, 'w') as f:
+        f.write('graph [\n    directed 0\n')
+        for i in range(node_count):
+            f.write('    node [\n        id {}\n        label "node {}"\n'
+                    '    ]\n'.format(i, i))
+        for s, t, w in zip(source, target, weight):
+            f.write('    edge [\n        source {}\n        target {}\n'
+                    '        weight {:.6f}\n    ]\n'.format(s, t, w))
+        f.write(']\n')
+
+
+def time_it(name, function, *args):
+    start = time.perf_counter()
+    function(*args)
+    elapsed = time.perf_counter() - start
+    print("{:<30}{:>8.2f}s".format(name, elapsed))
+    return elapsed
+
+
+if __name__ == '__main__':
+    edge_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / 'benchmark.gml')
+        write_gml(path, edge_count)
+        print("{} edges".format(edge_count))
+
+        lines = time_it('get_gml(parser="lines")', pygmlion.get_gml, path,
+                        True, 'lines')
+        tokens = time_it('get_gml(parser="tokens")', pygmlion.get_gml, path,
+                         True, 'tokens')
+
+        time_it('get_gml(memory_map=True)',
+                lambda: pygmlion.get_gml(path, memory_map=True))
+        time_it('iter_gml', lambda: sum(1 for _ in pygmlion.iter_gml(path)))
+
+    print("speedup: {:.1f}x".format(lines / tokens))
@@ -0,0 +1,72 @@
+"""times json serialization of a web with a million edges.
+
+usage: `python benchmarks/json_serialization.py [edge count]`
+
+compares:
+- the old path: a recursive `safe_serialize` copy passed to `json.dumps`
+- `Web.json`, which uses the numpy-aware `JSONEncoder`
+- `Web.write_json`, which uses `orjson` when it is installed
+"""
+from pathlib import Path
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from webweb import Web
+
+
+def make_web(edge_count):
+    rng = np.random.default_rng(0)
+    node_count = edge_count // 10
+
+    source = rng.integers(0, node_count, edge_count)
+    target = rng.integers(0, node_count, edge_count)
+    weight = rng.random(edge_count)
+
+    # numpy scalars inside python lists are what `safe_serialize` is for
+    edges = [[s, t, w] for s, t, w in zip(source, target, weight)]
+
+    return Web(title='benchmark', adjacency=edges, copy=False)
+
+
+def legacy_json(web):
+    data = {
+        "display": vars(web.display),
+        'networks': {name: vars(data) for name, data in
+                     vars(web.networks).items()},
+        "title": web.title,
+    }
+
+    return json.dumps(web.safe_serialize(data))
+
+
+def write_json(web):
+    with open(os.devnull, 'w') as f:
+        web.write_json(f)
+
+
+def time_it(name, function, *args):
+    start = time.perf_counter()
+    function(*args)
+    elapsed = time.perf_counter() - start
+    print("{:<30}{:>8.2f}s".format(name, elapsed))
+    return elapsed
+
+
+if __name__ == '__main__':
+    edge_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    web = make_web(edge_count)
+    print("{} edges".format(edge_count))
+
+    legacy = time_it('safe_serialize + json.dumps', legacy_json, web)
+    encoder = time_it('Web.json', lambda: web.json)
+    streamed = time_it('Web.write_json', write_json, web)
+
+    print("speedup: {:.1f}x (Web.json), {:.1f}x (Web.write_json)".format(
+        legacy / encoder, legacy / streamed))
@@ -62,6 +62,9 @@ function Webweb(wwdata) {
 
     this.legendNodes = [];
     this.legendText = [];
+
+    // milliseconds to move nodes between precomputed layouts
+    this.layoutTransitionDuration = 500;
 }
 Webweb.prototype.standardizeNetworks = function(networks) {
     this.networks = {};
@@ -106,27 +109,252 @@ Webweb.prototype.standardizeNetwork = function(network) {
     }
 
     for (var i in network.layers) {
+        if (network.layers[i].nodeIndexes !== undefined) {
+            network.layers[i].nodes = this.getNodeTableNodes(network, network.layers[i].nodeIndexes);
+            delete network.layers[i].nodeIndexes;
+        }
+
+        // delta layers are rebuilt when they're displayed
+        if (network.layers[i].delta !== undefined) {
+            continue;
+        }
+
         network.layers[i] = this.standardizeLayer(network.layers[i]);
+        network.layers[i].edgeList = standardizeEdgeList(network.layers[i].edgeList);
         network.layers[i].nodeIdMap = this.getNodeIdMap(network.layers[i]);
+    }
+
+    return network;
+}
+////////////////////////////////////////////////////////////////////////////////
+// layers can list their nodes as indexes into a table of [name, attributes]
+// entries instead of holding a `nodes` object. The display's `nodeTable` holds
+// the entries shared by several networks and is numbered first; the network's
+// `nodeTable` holds the rest.
+//
+// entries are shared between layers, so their attributes shouldn't be modified
+////////////////////////////////////////////////////////////////////////////////
+Webweb.prototype.getNodeTableNodes = function(network, nodeIndexes) {
+    var webTable = this.display.nodeTable || [];
+    var networkTable = network.nodeTable || [];
+
+    var nodes = {};
+    for (var i = 0; i < nodeIndexes.length; i++) {
+        var index = nodeIndexes[i];
+        var entry = index < webTable.length ? webTable[index] : networkTable[index - webTable.length];
+        nodes[entry[0]] = entry[1];
+    }
+
+    return nodes;
+}
+////////////////////////////////////////////////////////////////////////////////
+// layers after a network's first can come as the changes from the layer before
+// them:
+// {
+//     'delta' : {
+//         'edgeList' : {'add' : [edges], 'remove' : [edges]},
+//         'nodes' : {'set' : {}, 'unset' : {}, 'remove' : [names]},
+//         'metadata' : {'set' : {}, 'remove' : [keys]},
+//     },
+//     'nodeCount' : int,
+// }
+//
+// removed edges are dropped (the first match of each), then added edges are
+// appended. Nodes and metadata that don't change are shared with the layer
+// before.
+////////////////////////////////////////////////////////////////////////////////
+Webweb.prototype.applyLayerDelta = function(previous, layer) {
+    var delta = layer.delta;
+
+    var rebuilt = {};
+    for (var key in layer) {
+        if (key !== 'delta' && key !== 'nodeCount') {
+            rebuilt[key] = layer[key];
+        }
+    }
+
+    rebuilt.edgeList = applyEdgeListDelta(previous.edgeList, delta.edgeList || {});
+    rebuilt.nodes = applyNodesDelta(previous.nodes, delta.nodes || {});
+    rebuilt.metadata = applyMetadataDelta(previous.metadata, delta.metadata || {});
 
-        for (var j in network.layers[i].edgeList) {
-            var edge = network.layers[i].edgeList[j];
-            var source = edge[0];
-            var target = edge[1];
+    rebuilt = this.standardizeLayer(rebuilt);
+    rebuilt.nodeIdMap = this.getNodeIdMap(rebuilt);
+    return rebuilt;
+}
+function applyEdgeListDelta(edgeList, delta) {
+    var removals = {};
+    standardizeEdgeList(delta.remove).forEach(function(edge) {
+        var key = getEdgeKey(edge);
+        removals[key] = (removals[key] || 0) + 1;
+    });
 
-            network.layers[i].edgeList[j][0] = isNaN(source) ? source : +source;
-            network.layers[i].edgeList[j][1] = isNaN(target) ? target : +target;
+    var edges = [];
+    getEdgeListArray(edgeList).forEach(function(edge) {
+        var key = getEdgeKey(edge);
+        if (removals[key]) {
+            removals[key] -= 1;
         }
+        else {
+            edges.push(edge);
+        }
+    });
+
+    return edges.concat(standardizeEdgeList(delta.add));
+}
+// typed array weights are float32s, so weights are compared as float32s
+function getEdgeKey(edge) {
+    var key = [edge[0], edge[1]];
+    if (edge.length == 3) {
+        key.push(Math.fround(edge[2]));
+    }
+    return JSON.stringify(key);
+}
+function getEdgeListArray(edgeList) {
+    if (Array.isArray(edgeList)) {
+        return edgeList;
     }
 
-    return network;
+    var edges = [];
+    var hasWeights = edgeList.weight !== undefined;
+    forEachEdge(edgeList, function(source, target, weight) {
+        edges.push(hasWeights ? [source, target, weight] : [source, target]);
+    });
+    return edges;
+}
+function applyNodesDelta(nodes, delta) {
+    var removed = {};
+    (delta.remove || []).forEach(function(name) {
+        removed[name] = true;
+    });
+
+    var rebuilt = {};
+    for (var name in nodes) {
+        if (! removed[name]) {
+            rebuilt[name] = nodes[name];
+        }
+    }
+
+    // nodes that change are copied; the rest are shared
+    var changed = {};
+    function getChangedNode(name) {
+        if (! changed[name]) {
+            var node = {};
+            for (var attribute in rebuilt[name]) {
+                node[attribute] = rebuilt[name][attribute];
+            }
+            rebuilt[name] = node;
+            changed[name] = true;
+        }
+        return rebuilt[name];
+    }
+
+    for (var name in delta.unset) {
+        var node = getChangedNode(name);
+        delta.unset[name].forEach(function(attribute) {
+            delete node[attribute];
+        });
+    }
+
+    for (var name in delta.set) {
+        var node = getChangedNode(name);
+        for (var attribute in delta.set[name]) {
+            node[attribute] = delta.set[name][attribute];
+        }
+    }
+
+    return rebuilt;
+}
+function applyMetadataDelta(metadata, delta) {
+    var rebuilt = {};
+    for (var key in metadata) {
+        rebuilt[key] = metadata[key];
+    }
+
+    (delta.remove || []).forEach(function(key) {
+        delete rebuilt[key];
+    });
+
+    for (var key in delta.set) {
+        rebuilt[key] = delta.set[key];
+    }
+
+    return rebuilt;
+}
+////////////////////////////////////////////////////////////////////////////////
+// edge lists come either as a list of [source, target, (weight)] lists, or as
+// base64 encoded little-endian typed arrays:
+// {
+//     'source' : Int32Array,
+//     'target' : Int32Array,
+//     'weight' : Float32Array, (optional)
+// }
+//
+// typed arrays are decoded as they are; lists have their node names converted
+// to numbers where possible
+////////////////////////////////////////////////////////////////////////////////
+function standardizeEdgeList(edgeList) {
+    if (edgeList == undefined) {
+        return [];
+    }
+
+    if (! Array.isArray(edgeList)) {
+        var typedEdgeList = {
+            'source' : decodeTypedArray(edgeList.source, Int32Array),
+            'target' : decodeTypedArray(edgeList.target, Int32Array),
+        };
+
+        if (edgeList.weight !== undefined) {
+            typedEdgeList.weight = decodeTypedArray(edgeList.weight, Float32Array);
+        }
+
+        return typedEdgeList;
+    }
+
+    for (var i in edgeList) {
+        var source = edgeList[i][0];
+        var target = edgeList[i][1];
+
+        edgeList[i][0] = isNaN(source) ? source : +source;
+        edgeList[i][1] = isNaN(target) ? target : +target;
+    }
+
+    return edgeList;
+}
+function decodeTypedArray(encoded, TypedArray) {
+    var binary = atob(encoded);
+    var bytes = new Uint8Array(binary.length);
+
+    for (var i = 0; i < binary.length; i++) {
+        bytes[i] = binary.charCodeAt(i);
+    }
+
+    return new TypedArray(bytes.buffer);
+}
+////////////////////////////////////////////////////////////////////////////////
+// calls `callback(source, target, weight)` for every edge in an edge list.
+// edges without a weight have a weight of 1
+////////////////////////////////////////////////////////////////////////////////
+function forEachEdge(edgeList, callback) {
+    if (Array.isArray(edgeList)) {
+        edgeList.forEach(function(edge) {
+            var weight = edge.length == 3 ? parseFloat(edge[2]) : 1;
+            callback(edge[0], edge[1], weight);
+        });
+    }
+    else {
+        var weights = edgeList.weight;
+        for (var i = 0; i < edgeList.source.length; i++) {
+            var weight = weights !== undefined ? weights[i] : 1;
+            callback(edgeList.source[i], edgeList.target[i], weight);
+        }
+    }
 }
 Webweb.prototype.getNodeIdMap = function(network) {
     var nodeNames = [];
 
-    network.edgeList.forEach(function(edge) {
-        nodeNames.push(edge[0]);
-        nodeNames.push(edge[1]);
+    forEachEdge(network.edgeList, function(source, target) {
+        nodeNames.push(source);
+        nodeNames.push(target);
     });
 
     if (getObjetPropertyCount(this.display.nodes) > 0) {
@@ -247,7 +475,8 @@ Webweb.prototype.createNodes = function() {
     for (var i in this.networks) {
         var network = this.networks[i];
         for (var i in network.layers) {
-            var nodeCount = this.getNodeCount(network.layers[i]);
+            var layer = network.layers[i];
+            var nodeCount = layer.delta !== undefined ? layer.nodeCount : this.getNodeCount(layer);
 
             if (nodeCount > this.maxNodeCount) {
                 this.maxNodeCount = nodeCount;
@@ -675,13 +904,10 @@ Webweb.prototype.createLinks = function() {
     }
 
     // push all the links to the list: links
-    for (var i in networkData.edgeList) {
-        var edge = networkData.edgeList[i];
-        var source = nodeIdMap[edge[0]];
-        var target = nodeIdMap[edge[1]];
-
-        // if there's no edge weight, default it to 1
-        var weight = edge.length == 3 ? parseFloat(edge[2]) : 1;
+    // (if there's no edge weight, it defaults to 1)
+    forEachEdge(networkData.edgeList, function(source, target, weight) {
+        source = nodeIdMap[source];
+        target = nodeIdMap[target];
 
         if (source <= target) {
             linkMatrix[source][target] += weight;
@@ -694,7 +920,7 @@ Webweb.prototype.createLinks = function() {
         this.nodes[target].degree += 1;
         this.nodes[source].strength += weight;
         this.nodes[target].strength += weight;
-    }
+    }.bind(this));
 
     var edgeWeights = [];
     this.links = [];
@@ -731,7 +957,25 @@ Webweb.prototype.createLinks = function() {
 // UTIL
 ////////////////////////////////////////////////////////////////////////////////
 Webweb.prototype.displayedNetworkData = function() {
-    return this.networks[this.display.networkName].layers[this.display.networkLayer];
+    return this.getNetworkLayer(this.display.networkName, this.display.networkLayer);
+}
+Webweb.prototype.getNetworkLayer = function(networkName, layerIndex) {
+    var layers = this.networks[networkName].layers;
+    layerIndex = +layerIndex;
+
+    // rebuild any delta layers between the last full layer and this one
+    var start = layerIndex;
+    while (start > 0 && layers[start].delta !== undefined) {
+        start -= 1;
+    }
+
+    for (var i = start + 1; i <= layerIndex; i++) {
+        if (layers[i].delta !== undefined) {
+            layers[i] = this.applyLayerDelta(layers[i - 1], layers[i]);
+        }
+    }
+
+    return layers[layerIndex];
 }
 Webweb.prototype.getSizeByType = function() {
     return this.allMetadata[this.display.sizeBy].type;
@@ -743,9 +987,101 @@ Webweb.prototype.getColorByType = function() {
 // Webweb:
 // simulation
 //////////////////////////////////////////////////////////////////////////////// 
+////////////////////////////////////////////////////////////////////////////////
+// layers can come with node positions computed by webweb's python layout, in
+// the `x` and `y` of their `nodes`. Those positions are centered on the
+// origin; they're moved to the center of the canvas.
+//
+// if the previously displayed layer had precomputed positions too, nodes that
+// were visible are moved there gradually from `previousPositions` (see
+// `startLayoutTransition`)
+//
+// returns true if the displayed layer has precomputed positions
+////////////////////////////////////////////////////////////////////////////////
+Webweb.prototype.getNodePositions = function() {
+    return this.nodes.map(function(node) {
+        return [node.x, node.y];
+    });
+}
+Webweb.prototype.setPrecomputedPositions = function(previousPositions) {
+    var networkData = this.displayedNetworkData();
+    var hadPrecomputedPositions = this.hasPrecomputedPositions;
+
+    this.hasPrecomputedPositions = networkData.precomputedLayout ? true : false;
+    this.layoutTransition = [];
+
+    if (! this.hasPrecomputedPositions) {
+        return false;
+    }
+
+    var nodeIdMap = networkData.nodeIdMap;
+    for (var name in networkData.nodes) {
+        var position = networkData.nodes[name];
+        var node = this.nodes[nodeIdMap[name]];
+
+        if (node !== undefined && position.x !== undefined && position.y !== undefined) {
+            var x = position.x + this.display.w / 2;
+            var y = position.y + this.display.h / 2;
+
+            var previous = previousPositions ? previousPositions[node.idx] : undefined;
+            if (hadPrecomputedPositions && previous !== undefined) {
+                this.layoutTransition.push([node, previous[0], previous[1], x, y]);
+            }
+
+            node.x = x;
+            node.y = y;
+            node.vx = 0;
+            node.vy = 0;
+        }
+    }
+
+    return true;
+}
 Webweb.prototype.tick = function() {
     webweb.canvas.redraw.call(webweb.canvas);
 }
+////////////////////////////////////////////////////////////////////////////////
+// moves nodes from where they were to their precomputed positions over
+// `layoutTransitionDuration` milliseconds, instead of simulating
+////////////////////////////////////////////////////////////////////////////////
+Webweb.prototype.startLayoutTransition = function() {
+    if (this.layoutTransitionTimer !== undefined) {
+        this.layoutTransitionTimer.stop();
+        this.layoutTransitionTimer = undefined;
+    }
+
+    var moves = this.layoutTransition;
+    if (moves == undefined || moves.length == 0) {
+        return;
+    }
+
+    var duration = this.layoutTransitionDuration;
+    var timer = d3.timer(function(elapsed) {
+        var t = d3.easeCubic(Math.min(1, elapsed / duration));
+
+        moves.forEach(function(move) {
+            var node = move[0];
+            node.x = node.fx = move[1] + (move[3] - move[1]) * t;
+            node.y = node.fy = move[2] + (move[4] - move[2]) * t;
+        });
+
+        webweb.canvas.redraw();
+
+        if (t == 1) {
+            timer.stop();
+        }
+    });
+
+    this.layoutTransitionTimer = timer;
+
+    // start from the old positions
+    moves.forEach(function(move) {
+        move[0].x = move[0].fx = move[1];
+        move[0].y = move[0].fy = move[2];
+    });
+
+    this.canvas.redraw();
+}
 Webweb.prototype.createSimulation = function() {
     this.simulation = d3.forceSimulation(this.nodes)
         .on('tick', this.tick);
@@ -859,8 +1195,24 @@ function writeVisualization(container) {
 // - uses the force (luke)
 ////////////////////////////////////////////////////////////////////////////////
 function displayNetwork() {
+    var previousPositions = webweb.getNodePositions();
+
     webweb.setNodeMetadata();
     webweb.createLinks();
+
+    // layers laid out ahead of time are shown as they are; other layers use
+    // the freeze setting the user chose
+    if (webweb.userFreezeNodeMovement === undefined) {
+        webweb.userFreezeNodeMovement = webweb.display.freezeNodeMovement;
+    }
+
+    if (webweb.setPrecomputedPositions(previousPositions)) {
+        webweb.display.freezeNodeMovement = true;
+    }
+    else {
+        webweb.display.freezeNodeMovement = webweb.userFreezeNodeMovement;
+    }
+
     webweb.updateSimulation();
 
     // update the menus with these new metadata
@@ -882,6 +1234,8 @@ function displayNetwork() {
         webweb.canvas.redraw();
     }
 
+    webweb.startLayoutTransition();
+
     computeLegend();
 }
 ////////////////////////////////////////////////////////////////////////////////
@@ -1140,6 +1494,10 @@ function changeGravity(g) {
         alert("Gravity must be nonnegative.");
     }
 }
+function changeFreezeNodes(isFrozen) {
+    webweb.userFreezeNodeMovement = isFrozen;
+    toggleFreezeNodes(isFrozen);
+}
 function toggleFreezeNodes(isFrozen) {
     webweb.display.freezeNodeMovement = isFrozen;
     if (isFrozen) {
@@ -1150,6 +1508,11 @@ function toggleFreezeNodes(isFrozen) {
         }
     }
     else {
+        if (webweb.layoutTransitionTimer !== undefined) {
+            webweb.layoutTransitionTimer.stop();
+            webweb.layoutTransitionTimer = undefined;
+        }
+
         for (var i = 0; i < webweb.simulation.nodes().length; i++) {
             webweb.simulation.nodes()[i].fx = undefined;
             webweb.simulation.nodes()[i].fy = undefined;
@@ -1899,7 +2262,7 @@ function writeMenus(container) {
                 'text' : 'Freeze nodes ',
                 'type' : 'checkbox',
                 'functions' : {
-                    'change' : toggleFreezeNodes,
+                    'change' : changeFreezeNodes,
                 },
                 'value' : webweb.display.freezeNodes,
                 'size' : 10,
@@ -2164,7 +2527,16 @@ function playNetworkLayers() {
 //
 ////////////////////////////////////////////////////////////////////////////////
 window.onload = function() {
-    initializeWebweb();
+    // the network data can be saved to a separate json file; if so, fetch it
+    if (typeof wwdata == 'undefined' && typeof wwdataURL !== 'undefined') {
+        d3.json(wwdataURL).then(function(data) {
+            wwdata = data;
+            initializeWebweb();
+        });
+    }
+    else {
+        initializeWebweb();
+    }
 };
 window.addEventListener("keydown", function (event) {
     listeners = {
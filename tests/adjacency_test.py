@@ -0,0 +1,107 @@
+from webweb import Web
+from webweb.webweb import EdgeList, Network
+import numpy as np
+import pytest
+
+
+def test_numpy_symmetric_matrix_matches_python_conversion():
+    matrix = np.array([
+        [0, 1, 0, 2],
+        [1, 0, 3, 0],
+        [0, 3, 0, 1],
+        [2, 0, 1, 0],
+    ])
+
+    expected = Network().convert_adjacency_matrix_to_list(matrix.tolist())
+    actual = Network().convert_adjacency_matrix_to_list(matrix)
+
+    assert actual == expected
+    assert actual == [[1, 0, 1], [2, 1, 3], [3, 0, 2], [3, 2, 1]]
+
+
+def test_numpy_asymmetric_matrix_matches_python_conversion():
+    matrix = np.array([
+        [0, 1.5, 0, 0],
+        [0, 0, 2.5, 0],
+        [0, 0, 0, 1],
+        [4, 0, 0, 7],
+    ])
+
+    expected = Network().convert_adjacency_matrix_to_list(matrix.tolist())
+    actual = Network().convert_adjacency_matrix_to_list(matrix)
+
+    assert actual == expected
+    assert actual == [[0, 1, 1.5], [1, 2, 2.5], [2, 3, 1.0], [3, 0, 4.0]]
+
+
+def test_add_numpy_adjacency_matrix():
+    matrix = np.array([
+        [0, 1, 0, 0],
+        [1, 0, 1, 0],
+        [0, 1, 0, 1],
+        [0, 0, 1, 0],
+    ])
+
+    web = Web(title='numpy', adjacency=matrix)
+    assert web.networks.numpy.layers[0]['edgeList'] == [
+        [1, 0, 1], [2, 1, 1], [3, 2, 1],
+    ]
+
+
+def test_add_numpy_edge_list():
+    edges = np.array([[0, 1], [1, 2], [2, 3], [3, 4], [4, 0]])
+
+    web = Web(title='numpy', adjacency=edges)
+    assert web.networks.numpy.layers[0]['edgeList'] == edges.tolist()
+
+
+def test_sparse_matrix_matches_dense_conversion():
+    sparse = pytest.importorskip('scipy.sparse')
+
+    matrix = np.array([
+        [0, 1, 0, 2],
+        [1, 0, 3, 0],
+        [0, 3, 0, 1],
+        [2, 0, 1, 5],
+    ])
+
+    for fmt in ['csr', 'csc', 'coo']:
+        actual = Network().convert_sparse_adjacency_matrix_to_list(
+            sparse.coo_matrix(matrix).asformat(fmt))
+        assert actual == Network().convert_adjacency_matrix_to_list(matrix)
+
+
+def test_sparse_matrix_sums_duplicates_and_drops_explicit_zeros():
+    sparse = pytest.importorskip('scipy.sparse')
+
+    # (0, 1) is stored twice and (2, 3) is an explicit zero
+    matrix = sparse.coo_matrix(
+        ([1, 2, 4, 0], ([0, 0, 1, 2], [1, 1, 2, 3])),
+        shape=(5, 5),
+    )
+
+    web = Web(title='sparse', adjacency=matrix)
+    assert web.networks.sparse.layers[0]['edgeList'] == [[0, 1, 3], [1, 2, 4]]
+
+
+def test_edge_list_behaves_like_a_list():
+    edges = EdgeList(np.array([0, 1, 2]), np.array([1, 2, 0]),
+                     np.array([0.5, 1, 2]))
+
+    assert len(edges) == 3
+    assert edges[1] == [1, 2, 1.0]
+    assert edges[-1] == [2, 0, 2.0]
+    assert edges[:2] == [[0, 1, 0.5], [1, 2, 1.0]]
+    assert list(edges) == [[0, 1, 0.5], [1, 2, 1.0], [2, 0, 2.0]]
+    assert [0, 1, 0.5] in edges
+    assert EdgeList([0], [1]).tolist() == [[0, 1]]
+
+
+def test_edge_list_serializes_like_a_list():
+    edges = np.array([[0, 1, 2], [1, 2, 3], [2, 3, 4], [3, 4, 5]])
+
+    web = Web(title='columnar', adjacency=edges)
+    layer = web.networks.columnar.layers[0]
+
+    assert isinstance(layer['edgeList'], EdgeList)
+    assert web.json == Web(title='columnar', adjacency=edges.tolist()).json
@@ -0,0 +1,377 @@
+import copy
+import io
+from pathlib import Path
+from webweb import pygmlion
+from webweb import Web
+from webweb.webweb import EdgeList, Network
+import numpy as np
+import pytest
+
+GML_EXAMPLE = str(Path(__file__).parent / 'data' / 'gml_example.gml')
+
+MIXED_GML = """# a comment before the graph
+Creator "webweb tests"
+directed 0
+graph [
+    label "two words"
+    node [
+        id 1
+        label "first"
+        weight 1.5
+    ]
+    node [ id 2 label "second" ]
+    # a comment inside the graph
+    edge [
+        source 1
+        target 2
+        weight .5
+    ]
+    edge [ source 2 target 1 ]
+]
+"""
+
+
+def write_gml_text(tmp_path, text, name='graph.gml'):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+@pytest.mark.parametrize('validate', [True, False])
+def test_token_parser_matches_line_parser(tmp_path, validate):
+    for filename in [GML_EXAMPLE, write_gml_text(tmp_path, MIXED_GML)]:
+        tokens = pygmlion.get_raw_gml(filename, validate, parser='tokens')
+        lines = pygmlion.get_raw_gml(filename, validate, parser='lines')
+
+        assert tokens == lines
+        assert (pygmlion.get_gml(filename, validate, parser='tokens') ==
+                pygmlion.get_gml(filename, validate, parser='lines'))
+
+
+def test_token_parser_reads_signed_numbers_and_deep_nesting(tmp_path):
+    depth = 5000
+    text = ('graph [ x -1 y +2.5e-1 ' + 'a [ v 1 ' * depth + ']' * depth +
+            ' node [ id 1 ] ]')
+    filename = write_gml_text(tmp_path, text)
+
+    raw = pygmlion.get_raw_gml(filename)
+    assert raw[0][1][:2] == [('x', -1), ('y', 0.25)]
+
+    graph = pygmlion.get_gml(filename)['graph'][0]
+    assert graph['x'] == -1 and graph['node'] == [{'id': 1}]
+
+    level = graph['a'][0]
+    for _ in range(depth - 1):
+        level = level['a'][0]
+
+    assert level == {'v': 1}
+
+
+def test_ids_only_need_to_be_unique_within_a_graph(tmp_path):
+    text = 'graph [ node [ id 1 ] ] graph [ node [ id 1 ] node [ id 2 ] ]'
+    gml = pygmlion.get_gml(write_gml_text(tmp_path, text))
+
+    assert [g['node'] for g in gml['graph']] == [
+        [{'id': 1}], [{'id': 1}, {'id': 2}],
+    ]
+
+
+@pytest.mark.parametrize('text, error', [
+    ('graph [ node [ id 1 ]', pygmlion.ListParseError),
+    ('graph [ label "unterminated ]', pygmlion.GMLParseError),
+    ('graph [ ] ]', pygmlion.GMLParseError),
+    ('graph [ id ]', pygmlion.GMLParseError),
+    ('graph [ edge [ source 1 ] ]', pygmlion.EdgeError),
+    ('graph [ node [ id 1 ] node [ id 1 ] ]', pygmlion.DuplicateIdsError),
+])
+def test_token_parser_errors(tmp_path, text, error):
+    with pytest.raises(error):
+        pygmlion.get_raw_gml(write_gml_text(tmp_path, text))
+
+
+def test_iter_gml_yields_headers_nodes_and_edges(tmp_path):
+    filename = write_gml_text(tmp_path, MIXED_GML)
+
+    events = list(pygmlion.iter_gml(filename))
+
+    assert events == [
+        ('attribute', ('Creator', 'webweb tests')),
+        ('attribute', ('directed', 0)),
+        ('graph', {'label': 'two words'}),
+        ('node', {'id': 1, 'label': 'first', 'weight': 1.5}),
+        ('node', {'id': 2, 'label': 'second'}),
+        ('edge', {'source': 1, 'target': 2, 'weight': 0.5}),
+        ('edge', {'source': 2, 'target': 1}),
+    ]
+
+    # tokens split across chunks read the same
+    for chunk_size in [1, 3, 7]:
+        assert list(pygmlion.iter_gml(filename, chunk_size=chunk_size)) == events
+
+
+def test_iter_gml_graphs_matches_get_gml(tmp_path):
+    text = MIXED_GML + 'graph [ directed 1 node [ id 1 ] node [ id 3 ] ]\n'
+    filename = write_gml_text(tmp_path, text)
+
+    graphs = pygmlion.get_gml(filename, validate=False)['graph']
+    streamed = [(header, list(elements)) for header, elements in
+                pygmlion.iter_gml_graphs(filename)]
+
+    assert [header for header, _ in streamed] == [
+        {'label': 'two words'}, {'directed': 1},
+    ]
+
+    for graph, (_, elements) in zip(graphs, streamed):
+        assert graph['node'] == [v for k, v in elements if k == 'node']
+        assert graph.get('edge', []) == [v for k, v in elements if k == 'edge']
+
+
+def test_web_reads_each_gml_graph_as_a_layer(tmp_path):
+    text = MIXED_GML + 'graph [ node [ id 1 ] node [ label "no id" ] ]\n'
+    web = Web(title='gml', gml_file=write_gml_text(tmp_path, text))
+
+    layers = web.networks.gml.layers
+    assert len(layers) == 2
+
+    assert layers[0]['edgeList'] == [[1, 2, 0.5], [2, 1]]
+    assert layers[0]['nodes'] == {
+        1: {'name': 'first', 'weight': 1.5},
+        2: {'name': 'second'},
+    }
+
+    assert layers[1]['nodes'] == {1: {'name': '1'}, 2: {'name': 'no id'}}
+
+    # a graph dict from `get_gml` reads the same as the streamed graph
+    graph = pygmlion.get_gml(write_gml_text(tmp_path, MIXED_GML))['graph'][0]
+    assert web.networks.gml.read_graph_from_gml(graph) == (
+        layers[0]['edgeList'], layers[0]['nodes'])
+
+
+def test_gml_file_can_be_passed_positionally():
+    web = Web([], 'gml', {}, None, {}, None, None, GML_EXAMPLE)
+    network = Network()
+    network.add_layer([], None, {}, None, None, GML_EXAMPLE)
+
+    assert web.networks.gml.layers
+    assert network.layers[0] == web.networks.gml.layers[0]
+
+
+def test_web_does_not_copy_what_it_reads_from_gml(tmp_path, monkeypatch):
+    copies = []
+    deepcopy = copy.deepcopy
+    monkeypatch.setattr(copy, 'deepcopy', lambda x: copies.append(x) or deepcopy(x))
+
+    metadata = {'kind': {'values': ['a', 'b']}}
+    web = Web(title='gml', gml_file=GML_EXAMPLE, metadata=metadata)
+
+    # only the metadata passed in is copied, once for each layer
+    layers = web.networks.gml.layers
+    assert copies == [metadata] * len(layers)
+    assert layers[0]['metadata'] == metadata
+    assert layers[0]['metadata'] is not metadata
+
+
+def test_gml_parses_from_buffers_and_memory_maps(tmp_path):
+    text = MIXED_GML.replace('"first"', '"café"')
+    filename = str(tmp_path / 'graph.gml')
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+    expected = pygmlion.get_gml(filename)
+    assert expected['graph'][0]['node'][0]['label'] == 'café'
+
+    data = text.encode('utf-8')
+    for buffer in [data, bytearray(data), memoryview(data)]:
+        assert pygmlion.get_gml(buffer) == expected
+        assert pygmlion.get_gml(buffer, parser='lines') == expected
+
+    assert pygmlion.get_gml(filename, memory_map=True) == expected
+    assert (list(pygmlion.iter_gml(data)) ==
+            list(pygmlion.iter_gml(filename)))
+
+    with pytest.raises(pygmlion.GMLParseError):
+        pygmlion.get_gml(b'graph [ label "unterminated ]', memory_map=True)
+
+
+def test_gml_graphs_read_in_a_process_pool_keep_their_order(tmp_path):
+    graphs = [
+        'graph [ label "{0} [x]" node [ id {0} ] edge [ source 1 target {0} ] ]'
+        ' # graph ['.format(i) for i in range(2, 10)
+    ]
+    text = 'Creator "me"\nlist [ graph [ id 1 ] ]\n' + '\n'.join(graphs)
+    filename = write_gml_text(tmp_path, text)
+
+    assert len(pygmlion.get_graph_spans(filename)) == len(graphs)
+
+    serial = Web(title='gml', gml_file=filename)
+    pooled = Web(title='gml', gml_file=filename, gml_workers=2)
+
+    assert len(pooled.networks.gml.layers) == len(graphs)
+    assert pooled.networks.gml.layers == serial.networks.gml.layers
+
+
+def legacy_gml_text(content):
+    if type(content) == dict:
+        content = pygmlion.convert_gml_dict_to_tuple_list(copy.deepcopy(content))
+
+    elements = [pygmlion.create_element(k, v).write() for k, v in content]
+    return "\n".join(elements) + "\n"
+
+
+def test_write_gml_matches_the_element_writer(tmp_path):
+    filename = write_gml_text(tmp_path, MIXED_GML + 'list []\n')
+
+    for content in [
+        pygmlion.get_raw_gml(filename),
+        pygmlion.get_gml(filename),
+    ]:
+        expected = legacy_gml_text(content)
+        before = copy.deepcopy(content)
+
+        output = str(tmp_path / 'written.gml')
+        pygmlion.write_gml(content, output)
+
+        assert Path(output).read_text() == expected
+        assert content == before
+
+    # and what's written reads the same
+    assert pygmlion.get_gml(output) == pygmlion.get_gml(filename)
+
+
+def test_write_gml_only_writes_comments_as_comments():
+    f = io.StringIO()
+    pygmlion.write_gml({'graph': [{'node': [{'id': 1, 'tag': '#x'}]}]}, f)
+
+    graph = pygmlion.get_gml(f.getvalue().encode())['graph'][0]
+    assert graph['node'] == [{'id': 1, 'tag': '#x'}]
+
+    with pytest.raises(ValueError):
+        pygmlion.write_gml({'label': 'a "quoted" word'}, io.StringIO())
+
+
+def test_write_gml_streams_generators(tmp_path):
+    node_count = 5000
+
+    def nodes():
+        for i in range(node_count):
+            yield {'id': i, 'label': 'node {}'.format(i)}
+
+    def edges():
+        for i in range(1, node_count):
+            yield {'source': i - 1, 'target': i, 'weight': 0.5}
+
+    f = io.StringIO()
+    pygmlion.write_gml({
+        'graph': [{'directed': 0, 'edge': edges(), 'node': nodes()}],
+    }, f)
+
+    graph = pygmlion.get_gml(f.getvalue().encode())['graph'][0]
+    assert graph['directed'] == 0
+    assert graph['node'] == list(nodes())
+    assert graph['edge'] == list(edges())
+
+    # lists are written without recursion
+    depth = 5000
+    content = [('v', 1)]
+    for _ in range(depth):
+        content = [('a', content)]
+
+    f = io.StringIO()
+    pygmlion.write_gml(content, f)
+    assert f.getvalue().count('[') == depth
+
+
+def test_network_to_gml_round_trips_layers(tmp_path):
+    edges = EdgeList(np.array([0, 1, 2]), np.array([1, 2, 5]))
+    web = Web(title='gml', adjacency=edges)
+    web.networks.gml.add_layer(
+        adjacency=[[0, 1], [1, 3]],
+        nodes={0: {'name': 'zero', 'size': 3, 'missing': None}, 7: {}},
+    )
+
+    filename = str(tmp_path / 'web.gml')
+    web.to_gml(filename)
+
+    graphs = pygmlion.get_gml(filename)['graph']
+    assert [g['label'] for g in graphs] == ['gml', 'gml']
+    # in the client's order, which sorts integer nodes
+    assert graphs[1]['node'] == [
+        {'id': 0, 'name': 'zero', 'size': 3},
+        {'id': 1},
+        {'id': 3},
+        {'id': 7},
+    ]
+
+    read = Web(title='gml', gml_file=filename).networks.gml.layers
+    assert read[0]['edgeList'] == [[0, 1], [1, 2], [2, 5]]
+    assert sorted(read[0]['nodes']) == [0, 1, 2, 5]
+    assert read[1]['edgeList'] == [[0, 1], [1, 3]]
+    assert read[1]['nodes'][0] == {'name': 'zero', 'size': 3}
+
+
+def test_network_to_gml_numbers_nodes_that_are_not_integers():
+    network = Network(adjacency=[['a', 'b', 0.5], ['b', 'c', 2]],
+                      nodes={'a': {'size': 1}})
+
+    f = io.StringIO()
+    network.to_gml(f)
+
+    graph = pygmlion.get_gml(f.getvalue().encode())['graph'][0]
+    assert graph['node'] == [
+        {'id': 0, 'label': 'a', 'size': 1},
+        {'id': 1, 'label': 'b'},
+        {'id': 2, 'label': 'c'},
+    ]
+    assert graph['edge'] == [
+        {'source': 0, 'target': 1, 'weight': 0.5},
+        {'source': 1, 'target': 2, 'weight': 2},
+    ]
+
+
+def test_network_to_gml_writes_layers_without_nodes():
+    network = Network(adjacency=[[0, 1]], nodes=None)
+
+    f = io.StringIO()
+    network.to_gml(f)
+
+    graph = pygmlion.get_gml(f.getvalue().encode())['graph'][0]
+    assert graph['node'] == [{'id': 0}, {'id': 1}]
+    assert graph['edge'] == [{'source': 0, 'target': 1}]
+
+
+def test_network_to_gml_round_trips_a_networkx_layer():
+    nx = pytest.importorskip('networkx')
+
+    G = nx.Graph()
+    G.add_node('lonely', kind='island')
+    G.add_edge('a', 'b', weight=2)
+    G.add_edge('b', 'c', weight=1)
+    for node in 'abc':
+        G.nodes[node]['kind'] = 'letter'
+    G.nodes['a']['tags'] = ['x', 'y']
+
+    f = io.StringIO()
+    Web(title='nx', nx_G=G).networks.nx.to_gml(f)
+
+    graph = pygmlion.get_gml(f.getvalue().encode())['graph'][0]
+    nodes = {node['name']: node for node in graph['node']}
+
+    # names and attributes are in the layer's metadata
+    assert sorted(nodes) == ['a', 'b', 'c', 'lonely']
+    assert nodes['lonely']['kind'] == 'island'
+    assert nodes['b']['kind'] == 'letter'
+
+    # a list is written as its values, each under the list's key
+    assert 'tags "x"\n        tags "y"' in f.getvalue()
+
+    ids = {node['id']: name for name, node in nodes.items()}
+    assert sorted(
+        (ids[edge['source']], ids[edge['target']], edge['weight'])
+        for edge in graph['edge']
+    ) == [('a', 'b', 2), ('b', 'c', 1)]
+
+
+
+def test_write_gml_explains_lists_it_cannot_write():
+    with pytest.raises(TypeError, match='key, value'):
+        pygmlion.write_gml([('node', [('id', 1), 5])], io.StringIO())
@@ -0,0 +1,30 @@
+from webweb import Web
+import numpy as np
+import pytest
+
+graph_tool = pytest.importorskip('graph_tool')
+
+
+def test_graph_tool_graph_is_read_as_columns():
+    G = graph_tool.Graph(directed=False)
+    G.add_vertex(4)
+    G.add_edge_list([(0, 2), (2, 3)])
+
+    weight = G.new_edge_property('double')
+    weight.a = [1.5, 2.0]
+    G.edge_properties['weight'] = weight
+
+    name = G.new_vertex_property('string')
+    for vertex, value in zip(G.vertices(), ['a', 'b', 'c', 'd']):
+        name[vertex] = value
+    G.vertex_properties['name'] = name
+
+    size = G.new_vertex_property('int')
+    size.a = [1, 2, 3, 4]
+    G.vertex_properties['size'] = size
+
+    layer = Web(title='gt', gt_G=G).networks.gt.layers[0]
+
+    assert layer['edgeList'] == [[0, 1, 1.5], [1, 2, 2.0]]
+    assert layer['metadata']['name']['values'] == ['a', 'c', 'd', 'b']
+    assert np.array_equal(layer['metadata']['size']['values'], [1, 3, 4, 2])
@@ -0,0 +1,127 @@
+from webweb import Web
+import json
+import os
+from pathlib import Path
+from urllib.parse import quote
+
+
+def fake_client(path):
+    for dir_name, file_name in Web.client_files.values():
+        path.joinpath(dir_name).mkdir(exist_ok=True)
+        path.joinpath(dir_name, file_name).write_text(file_name)
+
+    return path
+
+
+def test_client_file_content_is_cached(tmp_path, monkeypatch):
+    client = fake_client(tmp_path)
+    monkeypatch.setattr(Web, 'client_path', classmethod(lambda cls: client))
+    Web.clear_client_file_cache()
+
+    style = client.joinpath('css', 'style.css')
+
+    assert Web.get_client_file_content('css', 'style.css') == 'style.css'
+
+    # a cached file isn't reread while its modification time is unchanged
+    stat = style.stat()
+    style.write_text('changed')
+    os.utime(style, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert Web.get_client_file_content('css', 'style.css') == 'style.css'
+
+    os.utime(style, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert Web.get_client_file_content('css', 'style.css') == 'changed'
+
+    Web.clear_client_file_cache()
+    assert not Web.client_file_cache
+
+
+def test_html_shell_is_reused(tmp_path, monkeypatch):
+    client = fake_client(tmp_path)
+    monkeypatch.setattr(Web, 'client_path', classmethod(lambda cls: client))
+    Web.clear_client_file_cache()
+
+    head, tail = Web.html_shell()
+    assert Web.html_shell()[0] is head
+    assert 'd3.v5.min.js' in head and 'webweb.v5.js' in tail
+
+    webweb_js = client.joinpath('js', 'webweb.v5.js')
+    webweb_js.write_text('updated')
+    stat = webweb_js.stat()
+    os.utime(webweb_js, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert 'updated' in Web.html_shell()[1]
+
+    web = Web([[0, 1]])
+    assert web.html == (
+        head + '<script type="text/javascript">var wwdata = ' + web.json +
+        ';</script>' + Web.html_shell()[1]
+    )
+
+    Web.clear_client_file_cache()
+
+
+def test_save_with_shared_assets(tmp_path):
+    web = Web([[0, 1]])
+    asset_path = tmp_path.joinpath('assets')
+    html_path = tmp_path.joinpath('reports', 'web.html')
+    html_path.parent.mkdir()
+
+    web.save(str(html_path), asset_path=asset_path)
+
+    html = html_path.read_text()
+    d3 = asset_path.joinpath('js', 'd3.v5.min.js')
+
+    assert d3.read_text() == Web.get_client_file_content('js', 'd3.v5.min.js')
+    assert 'src="../assets/js/d3.v5.min.js"' in html
+    assert 'href="../assets/css/style.css"' in html
+    assert 'var wwdata = ' in html
+    assert Web.get_client_file_content('js', 'webweb.v5.js') not in html
+
+    # the shared copy is only written once
+    os.utime(d3, ns=(0, d3.stat().st_mtime_ns))
+    web.save(str(tmp_path.joinpath('other.html')), asset_path=asset_path)
+    assert d3.stat().st_atime_ns == 0
+
+
+def test_save_linking_to_client(tmp_path):
+    web = Web([[0, 1]])
+    html_path = tmp_path.joinpath('web.html')
+
+    web.save(str(html_path), asset_path=Web.client_path())
+
+    d3 = Web.client_file_path('js', 'd3.v5.min.js')
+    expected = quote(Path(os.path.relpath(d3, tmp_path)).as_posix())
+
+    assert 'src="{}"'.format(expected) in html_path.read_text()
+
+
+def test_save_with_javascript_data_file(tmp_path):
+    web = Web([[0, 1]])
+    html_path = tmp_path.joinpath('web.html')
+    data_path = tmp_path.joinpath('data', 'web.js')
+    data_path.parent.mkdir()
+
+    web.save(str(html_path), data_path=str(data_path))
+
+    html = html_path.read_text()
+    data = data_path.read_text()
+
+    assert '<script type="text/javascript" src="data/web.js"></script>' in html
+    assert 'var wwdata =' not in html
+    assert data.startswith('var wwdata = ')
+    assert json.loads(data[len('var wwdata = '):].strip()[:-1]) == \
+        json.loads(web.json)
+
+
+def test_save_with_json_data_file(tmp_path):
+    web = Web([[0, 1]])
+    html_path = tmp_path.joinpath('web.html')
+    data_path = tmp_path.joinpath('web.json')
+
+    web.save(str(html_path), asset_path=tmp_path, data_path=data_path)
+
+    html = html_path.read_text()
+
+    assert 'var wwdataURL = "web.json";' in html
+    assert 'var wwdata =' not in html
+    assert json.loads(data_path.read_text()) == json.loads(web.json)
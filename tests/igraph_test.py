@@ -0,0 +1,31 @@
+from webweb import Web
+from webweb.webweb import EdgeList
+import pytest
+
+igraph = pytest.importorskip('igraph')
+
+
+def test_igraph_graph_is_read_as_columns():
+    G = igraph.Graph(n=4, edges=[(0, 2), (2, 3)])
+    G.vs['name'] = ['a', 'b', 'c', 'd']
+    G.vs['group'] = [1, 2, 1, 2]
+    G.es['weight'] = [1.5, 2.0]
+
+    layer = Web(title='ig', ig_G=G).networks.ig.layers[0]
+
+    assert isinstance(layer['edgeList'], EdgeList)
+    assert layer['edgeList'] == [[0, 1, 1.5], [1, 2, 2.0]]
+
+    # `b` has no edges, so it comes last
+    assert layer['metadata']['name']['values'] == ['a', 'c', 'd', 'b']
+    assert layer['metadata']['group']['values'] == [1, 1, 2, 2]
+
+
+def test_igraph_graph_without_names_or_weights():
+    G = igraph.Graph(edges=[(0, 1), (1, 2)], directed=True)
+
+    layer = Web(title='ig', ig_G=G).networks.ig.layers[0]
+
+    assert layer['edgeList'].weight is None
+    assert layer['edgeList'] == [[0, 1], [1, 2]]
+    assert layer['metadata'] == {'name': {'values': [0, 1, 2]}}
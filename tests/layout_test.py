@@ -0,0 +1,345 @@
+from webweb import forcelayout
+from webweb import Web
+from webweb import webweb as webweb_module
+from webweb.webweb import EdgeList, Network
+import numpy as np
+import os
+import pytest
+
+
+def get_ring(node_count):
+    source = np.arange(node_count)
+    return source, (source + 1) % node_count
+
+
+def get_link_lengths(positions, source, target):
+    return np.hypot(*(positions[source] - positions[target]).T)
+
+
+def test_layout_is_centered_and_pulls_links_together():
+    source, target = get_ring(30)
+    positions = forcelayout.get_layout(source, target, 40)
+
+    assert positions.shape == (40, 2)
+    assert np.allclose(positions.mean(axis=0), 0)
+
+    linked = get_link_lengths(positions, source, target).mean()
+    unlinked = get_link_lengths(positions, source, (source + 15) % 30).mean()
+    assert linked < unlinked
+
+
+def test_layout_uses_display_parameters():
+    source, target = get_ring(20)
+
+    short = forcelayout.get_layout(source, target, 20, l=10)
+    long = forcelayout.get_layout(source, target, 20, l=60)
+
+    assert (get_link_lengths(short, source, target).mean() <
+            get_link_lengths(long, source, target).mean())
+
+
+def test_grid_charge_field_approximates_exact_field():
+    positions = forcelayout.get_initial_positions(1000) * 2
+
+    exact = forcelayout.get_exact_charge_field(positions)
+    grid = forcelayout.GridChargeField(1000, 20)(positions)
+
+    assert np.linalg.norm(grid - exact) < .05 * np.linalg.norm(exact)
+
+
+def test_grid_layout_matches_exact_layout_scale():
+    source, target = get_ring(200)
+
+    exact = forcelayout.get_layout(source, target, 200)
+    grid = forcelayout.get_layout(source, target, 200, exact_charge_limit=0)
+
+    exact_span, grid_span = np.ptp(exact, axis=0), np.ptp(grid, axis=0)
+    assert np.allclose(grid_span, exact_span, rtol=.2)
+
+
+def test_links_merge_like_the_client():
+    source, target = forcelayout.get_links(
+        [0, 1, 2, 2, 3, 4], [1, 0, 2, 3, 2, 3], 5, [1, 1, 1, 1, -1, 2])
+
+    assert source.tolist() == [0, 3]
+    assert target.tolist() == [1, 4]
+
+
+def test_compute_layout_positions_every_node():
+    nodes = {'a': {'kind': 'letter'}, '7': {'kind': 'number'}}
+    web = Web(title='layout', adjacency=[[0, 1], [1, 'a']], nodes=nodes,
+              metadata={'group': {'values': [0, 0, 1, 1, 1, 1]}})
+    web.compute_layout()
+
+    layer = web.networks.layout.layers[0]
+    assert layer['precomputedLayout']
+
+    # '7' is the same node as 7, and the metadata adds nodes 8 and 9
+    assert list(layer['nodes']) == ['a', '7', 0, 1, 8, 9]
+    assert layer['nodes']['a']['kind'] == 'letter'
+    assert all({'x', 'y'} <= set(node) for node in layer['nodes'].values())
+
+    # the caller's nodes aren't modified
+    assert nodes == {'a': {'kind': 'letter'}, '7': {'kind': 'number'}}
+
+
+def test_compute_layout_numbers_nodes_like_the_client():
+    layer = {
+        'edgeList': EdgeList(np.array([3, 5]), np.array([5, 9])),
+        'nodes': {'2': {}},
+        'metadata': {'size': {'values': list(range(6))}},
+    }
+
+    names, source, target, weight = Network.get_layer_node_indexes(
+        layer, {'nodes': {'x': {}}})
+
+    assert names == [3, 5, 9, 'x', 2, 10]
+    assert [names[i] for i in source] == [3, 5]
+    assert [names[i] for i in target] == [5, 9]
+    assert weight is None
+
+
+def test_compute_layout_sorts_integer_nodes_like_the_client():
+    layer = {'edgeList': [[5, 1], [1, 3]], 'nodes': {0: {}}}
+
+    names, source, target, weight = Network.get_layer_node_indexes(layer)
+
+    assert names == [0, 1, 3, 5]
+    assert [names[i] for i in source] == [5, 1]
+    assert [names[i] for i in target] == [1, 3]
+
+
+def test_web_layout_uses_display_parameters():
+    edges = [[i, (i + 1) % 20] for i in range(20)]
+
+    lengths = []
+    for length in [10, 60]:
+        web = Web(title='layout', adjacency=edges, display={'l': length})
+        web.compute_layout()
+
+        nodes = web.networks.layout.layers[0]['nodes']
+        lengths.append(np.mean([
+            np.hypot(nodes[s]['x'] - nodes[t]['x'], nodes[s]['y'] - nodes[t]['y'])
+            for s, t in edges
+        ]))
+
+    assert lengths[0] < lengths[1]
+
+
+def test_web_layout_reads_display_synonyms():
+    edges = [[i, (i + 1) % 20] for i in range(20)]
+
+    layouts = []
+    for display in [{}, {'c': 30, 'l': 60}, {'charge': 30, 'linkLength': 60},
+                    {'c': 30, 'l': 60, 'charge': 90, 'linkLength': 5}]:
+        web = Web(title='layout', adjacency=edges, display=display)
+        web.compute_layout()
+        layouts.append(web.networks.layout.layers[0]['nodes'])
+
+    default, short, long, both = layouts
+    assert short == long == both
+    assert short != default
+
+
+def get_ring_web(**display):
+    edges = [[i, (i + 1) % 10] for i in range(10)]
+    return Web(title='ring', adjacency=edges, display=display)
+
+
+def test_layout_cache_reuses_layouts(tmp_path):
+    cache = forcelayout.LayoutCache(tmp_path)
+    get_ring_web().compute_layout(cache=cache)
+
+    [(_, _, path)] = cache.get_files()
+
+    # swap the cached layout out, and make sure it's what comes back
+    cache.set(path.stem, np.arange(20).reshape(10, 2))
+
+    web = get_ring_web()
+    web.compute_layout(cache=cache)
+
+    nodes = web.networks.ring.layers[0]['nodes']
+    assert [nodes[i]['x'] for i in range(10)] == list(range(0, 20, 2))
+    assert len(cache.get_files()) == 1
+
+
+def test_layout_cache_keys_on_graph_and_parameters():
+    source, target = get_ring(10)
+    key = forcelayout.LayoutCache.get_key(source, target, 10)
+
+    assert key == forcelayout.LayoutCache.get_key(
+        list(source), list(target), 10, c=60)
+    assert key != forcelayout.LayoutCache.get_key(source, target, 11)
+    assert key != forcelayout.LayoutCache.get_key(source, target, 10, c=30)
+    assert key != forcelayout.LayoutCache.get_key(target, source, 10)
+    assert key != forcelayout.LayoutCache.get_key(
+        source, target, 10, names=list('abcdefghij'))
+
+
+def test_layout_cache_evicts_least_recently_used(tmp_path):
+    positions = np.zeros((100, 2))
+
+    cache = forcelayout.LayoutCache(tmp_path)
+    for i, key in enumerate(['a', 'b', 'c']):
+        cache.set(key, positions)
+        os.utime(cache.get_file(key), (i, i))
+
+    # reading 'a' makes 'b' the least recently used
+    assert cache.get('a') is not None
+
+    cache.max_size = cache.size - 1
+    cache.evict()
+
+    assert [path.stem for _, _, path in cache.get_files()] == ['c', 'a']
+
+    cache.clear()
+    assert cache.get_files() == []
+
+
+def test_layout_cache_only_lists_its_files_when_it_has_to(tmp_path, monkeypatch):
+    positions = np.zeros((100, 2))
+
+    cache = forcelayout.LayoutCache(tmp_path)
+    cache.set('a', positions)
+    file_size = cache.size
+
+    listings = []
+    get_files = cache.get_files
+    monkeypatch.setattr(cache, 'get_files', lambda: listings.append(1) or get_files())
+
+    cache.max_size = 3 * file_size
+    for key in ['b', 'c', 'b']:
+        cache.set(key, positions)
+
+    assert listings == []
+    assert cache.known_size == 3 * file_size
+
+    # going over `max_size` evicts
+    cache.set('d', positions)
+    assert listings == [1]
+    assert cache.known_size == cache.size == 3 * file_size
+
+
+def test_layout_cache_path_is_resolved_when_used(tmp_path, monkeypatch):
+    def no_home():
+        raise RuntimeError("no home directory")
+
+    monkeypatch.setattr(forcelayout.Path, 'home', no_home)
+
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    assert forcelayout.LayoutCache().path == tmp_path / 'webweb' / 'layouts'
+
+    monkeypatch.delenv('XDG_CACHE_HOME')
+    assert forcelayout.LayoutCache(tmp_path).path == tmp_path
+
+
+def test_default_layout_cache_is_made_once_per_call(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+
+    # webweb imports forcelayout as a top level module
+    LayoutCache = webweb_module.forcelayout.LayoutCache
+
+    caches = []
+    init = LayoutCache.__init__
+
+    def counted_init(self, *args, **kwargs):
+        caches.append(self)
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(LayoutCache, '__init__', counted_init)
+
+    web = get_ring_web()
+    web.networks.other.add_layer(adjacency=[[0, 5]])
+    for i in range(3):
+        web.networks.ring.add_layer(adjacency=[[i, i + 1]])
+
+    web.warm_layout_cache()
+    web.compute_layout(cache=True)
+
+    assert len(caches) == 2
+    assert len(caches[0].get_files()) == 5
+
+
+def test_warm_layout_cache_leaves_web_alone(tmp_path):
+    cache = forcelayout.LayoutCache(tmp_path)
+
+    web = get_ring_web(c=30)
+    web.warm_layout_cache(cache)
+
+    assert 'precomputedLayout' not in web.networks.ring.layers[0]
+    assert len(cache.get_files()) == 1
+
+    web.compute_layout(cache=cache)
+    assert len(cache.get_files()) == 1
+
+
+def test_save_lays_out_with_cache(tmp_path):
+    cache = forcelayout.LayoutCache(tmp_path / 'layouts')
+
+    web = get_ring_web()
+    web.save(str(tmp_path / 'ring.html'), layout=cache)
+
+    assert web.networks.ring.layers[0]['precomputedLayout']
+    assert '"precomputedLayout": true' in (tmp_path / 'ring.html').read_text()
+    assert len(cache.get_files()) == 1
+
+
+def test_missing_nodes_start_next_to_their_neighbors():
+    positions = np.array([[100, 100], [np.nan, np.nan], [np.nan, np.nan]])
+
+    forcelayout.place_missing_nodes(
+        positions, np.array([0]), np.array([1]), np.random.default_rng(0))
+
+    assert np.hypot(*(positions[1] - positions[0])) < forcelayout.INITIAL_RADIUS
+    assert np.allclose(positions[2], forcelayout.get_initial_positions(3)[2])
+
+
+def test_warm_started_layers_keep_nodes_in_place():
+    source, target = get_ring(40)
+    first = [[s, t] for s, t in zip(source.tolist(), target.tolist())]
+    second = first[:-1] + [[0, 40]]
+
+    moves = []
+    for warm_start in [False, True]:
+        web = Web(title='layers')
+        web.networks.layers.add_layer(adjacency=first)
+        web.networks.layers.add_layer(adjacency=second)
+        web.compute_layout(warm_start=warm_start)
+
+        before, after = [
+            layer['nodes'] for layer in web.networks.layers.layers]
+
+        assert set(after) == set(range(41))
+        moves.append(np.mean([
+            np.hypot(before[i]['x'] - after[i]['x'],
+                     before[i]['y'] - after[i]['y'])
+            for i in range(40)
+        ]))
+
+    assert moves[1] < moves[0] / 2
+
+
+def test_warm_start_matches_renumbered_nodes_by_name():
+    nx = pytest.importorskip('networkx')
+
+    web = Web(title='graphs')
+    web.networks.graphs.add_layer(nx_G=nx.Graph([('a', 'b'), ('b', 'c')]))
+    web.networks.graphs.add_layer(nx_G=nx.Graph([('z', 'a'), ('a', 'b'), ('b', 'c')]))
+
+    identities = []
+    for layer in web.networks.graphs.layers:
+        names = Network.get_layer_node_indexes(layer)[0]
+        identities.append(Network.get_node_identities(layer, names))
+
+    assert sorted(identities[0]) == ['a', 'b', 'c']
+
+    previous_positions = np.arange(6.).reshape(3, 2)
+    positions = Network.get_starting_positions(
+        identities[1], identities[0], previous_positions)
+
+    for identity, position in zip(identities[1], positions):
+        if identity == 'z':
+            assert np.isnan(position).all()
+        else:
+            assert position.tolist() == previous_positions[
+                identities[0].index(identity)].tolist()
@@ -0,0 +1,45 @@
+from webweb import Web
+from webweb.webweb import Network
+import numpy as np
+
+
+def test_add_layer_copies_by_default():
+    edges = [[0, 1], [1, 2]]
+    nodes = {0: {'name': 'a'}}
+    metadata = {'size': {'values': [1, 2, 3]}}
+
+    network = Network()
+    network.add_layer(adjacency=edges, nodes=nodes, metadata=metadata)
+    layer = network.layers[0]
+
+    assert layer['edgeList'] == edges and layer['edgeList'] is not edges
+    assert layer['nodes'] == nodes and layer['nodes'] is not nodes
+    assert layer['metadata'] == metadata and layer['metadata'] is not metadata
+
+
+def test_add_layer_without_copying():
+    edges = [[0, 1], [1, 2]]
+    nodes = {0: {'name': 'a'}}
+    metadata = {'size': {'values': [1, 2, 3]}}
+
+    network = Network()
+    network.add_layer(adjacency=edges, nodes=nodes, metadata=metadata,
+                      copy=False)
+    layer = network.layers[0]
+
+    assert layer['edgeList'] is edges
+    assert layer['nodes'] is nodes
+    assert layer['metadata'] is metadata
+
+
+def test_web_without_copying_numpy_edge_list():
+    edges = np.array([[0, 1], [1, 2], [2, 3], [3, 4], [4, 5]])
+
+    copied = Web(title='copied', adjacency=edges)
+    owned = Web(title='owned', adjacency=edges, copy=False)
+
+    copied_layer = copied.networks.copied.layers[0]
+    owned_layer = owned.networks.owned.layers[0]
+
+    assert not np.shares_memory(copied_layer['edgeList'].source, edges)
+    assert np.shares_memory(owned_layer['edgeList'].source, edges)
@@ -0,0 +1,88 @@
+from webweb import Web
+from webweb.webweb import EdgeList
+import copy
+import networkx as nx
+
+
+def named_edges(layer):
+    names = layer['metadata']['name']['values']
+    return sorted(
+        (names[edge[0]], names[edge[1]]) + tuple(edge[2:])
+        for edge in layer['edgeList']
+    )
+
+
+def make_graph():
+    G = nx.Graph()
+    G.add_node('isolated', group='b')
+    G.add_edge('x', 'y', weight=2.0)
+    G.add_edge('y', 'z', weight=0.5)
+    G.add_edge('z', 'z')
+    G.nodes['x'].update(group='a', label='only x')
+    G.nodes['y']['group'] = 'a'
+    G.nodes['z'].update(group='b', name='Zed')
+    return G
+
+
+def test_networkx_graph_is_read_as_columns():
+    G = make_graph()
+
+    layer = Web(title='nx', nx_G=G).networks.nx.layers[0]
+
+    assert isinstance(layer['edgeList'], EdgeList)
+    assert named_edges(layer) == [
+        ('Zed', 'Zed', 1.0), ('x', 'y', 2.0), ('y', 'Zed', 0.5),
+    ]
+
+    # nodes with edges come first, so vectorized metadata lines up with the
+    # client's node numbering
+    metadata = layer['metadata']
+    assert metadata['name']['values'] == ['x', 'y', 'Zed', 'isolated']
+    assert metadata['group']['values'] == ['a', 'a', 'b', 'b']
+    assert layer['nodes'] == {0: {'label': 'only x'}}
+
+
+def test_networkx_graph_is_not_modified():
+    G = make_graph()
+    before = copy.deepcopy(dict(G.nodes(data=True)))
+
+    Web(title='nx', nx_G=G)
+    Web(title='nx', nx_G=nx.MultiGraph(G))
+
+    assert dict(G.nodes(data=True)) == before
+
+
+def test_networkx_digraph_and_unweighted_edges():
+    G = nx.DiGraph([(2, 1), (1, 2), (1, 3)])
+
+    layer = Web(title='nx', nx_G=G).networks.nx.layers[0]
+
+    assert layer['edgeList'].weight is None
+    assert named_edges(layer) == [(1, 2), (1, 3), (2, 1)]
+
+
+def test_networkx_weights_that_are_not_numbers_use_the_slower_path():
+    G = nx.Graph()
+    G.add_edge(0, 1, weight='heavy')
+
+    layer = Web(title='nx', nx_G=G).networks.nx.layers[0]
+
+    assert layer['edgeList'] == [[0, 1, 'heavy']]
+
+
+def test_networkx_multigraph_keeps_every_edge():
+    G = nx.MultiGraph([(0, 1), (0, 1)])
+
+    layer = Web(title='nx', nx_G=G).networks.nx.layers[0]
+
+    assert layer['edgeList'] == [[0, 1], [0, 1]]
+    assert layer['nodes'] == {0: {'name': 0}, 1: {'name': 1}}
+
+
+def test_none_weights_are_unweighted():
+    G = nx.Graph()
+    G.add_edge('a', 'b', weight=None)
+    G.add_edge('b', 'c', weight=2)
+
+    layer = Web(title='none', nx_G=G).networks.none.layers[0]
+    assert named_edges(layer) == [('a', 'b', 1), ('b', 'c', 2)]
@@ -0,0 +1,308 @@
+from webweb import Web
+from webweb import webweb as webweb_module
+from webweb.webweb import EdgeList
+import base64
+import io
+import json
+import numpy as np
+
+
+def make_web():
+    web = Web(
+        title='serialization',
+        adjacency=[[i, i + 1, np.float64(i / 2)] for i in range(25)],
+        nodes={np.int64(0): {'name': 'zero', 'size': np.int32(3)}},
+        metadata={'isOdd': {'values': [bool(i % 2) for i in range(26)]}},
+        display={'c': np.int64(40)},
+    )
+    web.networks.serialization.add_layer(
+        adjacency=np.array([[0, 1], [1, 2], [2, 3], [3, 4]]))
+    web.networks.other(adjacency=[])
+    return web
+
+
+def test_streamed_json_matches_dumps():
+    web = make_web()
+
+    data = {
+        "display": vars(web.display),
+        'networks': {name: vars(data) for name, data in
+                     vars(web.networks).items()},
+        "title": web.title,
+    }
+    expected = json.dumps(web.safe_serialize(data))
+
+    for chunk_size in [1, 7, 10000]:
+        assert "".join(web.iter_json(chunk_size=chunk_size)) == expected
+
+    assert web.json == expected
+
+
+def test_write_json():
+    web = make_web()
+
+    f = io.StringIO()
+    web.write_json(f, fast=False)
+    assert f.getvalue() == web.json
+
+    f = io.StringIO()
+    web.write_json(f)
+    assert json.loads(f.getvalue()) == json.loads(web.json)
+
+
+def test_fast_json_writes_nan_as_null(monkeypatch):
+    web = Web(title='nan', adjacency=[[0, 1, float('nan')]], metadata={
+        'size': {'values': np.array([1, np.nan])},
+    })
+
+    outputs = []
+    for module in [webweb_module.orjson, None]:
+        monkeypatch.setattr(webweb_module, 'orjson', module)
+
+        f = io.StringIO()
+        web.write_json(f)
+        outputs.append(json.loads(f.getvalue()))
+
+    assert outputs[0] == outputs[1]
+    assert outputs[1]['networks']['nan']['layers'][0]['edgeList'] == [[0, 1, None]]
+    assert outputs[1]['networks']['nan']['layers'][0]['metadata']['size']['values'] == [1, None]
+
+    # the default json still matches `json.dumps`
+    assert 'NaN' in web.json
+
+
+def test_write_html_embeds_json():
+    web = make_web()
+
+    f = io.StringIO()
+    web.write_html(f)
+
+    head, tail = web.html_shell()
+    head += '<script type="text/javascript">var wwdata = '
+    tail = ';</script>' + tail
+    html = f.getvalue()
+
+    assert html.startswith(head) and html.endswith(tail)
+    assert json.loads(html[len(head):-len(tail)]) == json.loads(web.json)
+    assert "var wwdata = {};".format(web.json) in web.html
+
+
+def test_encode_json_handles_numpy():
+    web = Web()
+    data = {
+        'int': np.int64(1),
+        'float': np.float32(0.5),
+        'bool': np.bool_(True),
+        'array': np.arange(3),
+        'nested': [(np.int8(1), np.float64(2.5))],
+    }
+    expected = {
+        'int': 1,
+        'float': 0.5,
+        'bool': True,
+        'array': [0, 1, 2],
+        'nested': [[1, 2.5]],
+    }
+
+    assert web.encode_json(data) == json.dumps(expected)
+    assert json.loads(web.encode_json(data, fast=True)) == expected
+    assert web.encode_json({np.int64(1): 'a'}) == json.dumps({1: 'a'})
+
+
+def decode(encoded, dtype):
+    return np.frombuffer(base64.b64decode(encoded), dtype=dtype).tolist()
+
+
+def test_binary_edges():
+    web = Web(title='binary', adjacency=[[i, i + 1, i / 4] for i in range(10)])
+    web.networks.binary.add_layer(adjacency=[['a', 'b'], ['b', 'c']])
+
+    data = json.loads("".join(web.iter_json(chunk_size=4, binary_edges=True)))
+    typed, named = data['networks']['binary']['layers']
+
+    assert decode(typed['edgeList']['source'], '<i4') == list(range(10))
+    assert decode(typed['edgeList']['target'], '<i4') == list(range(1, 11))
+    assert decode(typed['edgeList']['weight'], '<f4') == [i / 4 for i in range(10)]
+
+    # nodes named with strings can't be sent as typed arrays
+    assert named['edgeList'] == [['a', 'b'], ['b', 'c']]
+
+
+def test_typed_edge_columns():
+    columns = Web.get_typed_edge_columns(EdgeList([0, 1], [1, 2]))
+    assert sorted(columns) == ['source', 'target']
+    assert columns['source'].dtype == np.dtype('<i4')
+
+    assert Web.get_typed_edge_columns([[0, 1], [1, 2, 3]]) is None
+    assert Web.get_typed_edge_columns([[0.5, 1]]) is None
+    assert Web.get_typed_edge_columns([[2 ** 40, 1]]) is None
+    assert Web.get_typed_edge_columns([]) is None
+
+
+def make_layers_web():
+    web = Web(title='layers')
+    edges = [[i, i + 1] for i in range(10)]
+    nodes = {i: {'group': i % 2} for i in range(11)}
+
+    for step in range(4):
+        edges = edges[1:] + [[step, step + 5]]
+        nodes = {key: dict(value) for key, value in nodes.items()}
+        nodes[step] = {'group': 7}
+        nodes.pop(10 - step, None)
+
+        web.networks.layers.add_layer(
+            adjacency=edges, nodes=nodes,
+            metadata={'step': {'values': [step] * 11}, 'constant': {'values': [1] * 11}})
+
+    return web
+
+
+def apply_delta(previous, layer):
+    """rebuilds a delta layer like the client does"""
+    delta = layer['delta']
+
+    edges = [list(edge) for edge in previous['edgeList']]
+    for edge in delta['edgeList']['remove']:
+        edges.remove(edge)
+    edges += delta['edgeList']['add']
+
+    nodes = {key: dict(value) for key, value in previous['nodes'].items()}
+    for key in delta['nodes'].get('remove', []):
+        del nodes[str(key)]
+    for key, attributes in delta['nodes'].get('unset', {}).items():
+        for attribute in attributes:
+            del nodes[key][attribute]
+    for key, attributes in delta['nodes'].get('set', {}).items():
+        nodes.setdefault(key, {}).update(attributes)
+
+    metadata = dict(previous['metadata'])
+    for key in delta['metadata'].get('remove', []):
+        del metadata[key]
+    metadata.update(delta['metadata'].get('set', {}))
+
+    return {'edgeList': edges, 'nodes': nodes, 'metadata': metadata}
+
+
+def test_delta_layers_rebuild_layers():
+    web = make_layers_web()
+
+    full = json.loads(web.json)['networks']['layers']['layers']
+    delta = json.loads("".join(web.iter_json(delta_layers=True)))
+    layers = delta['networks']['layers']['layers']
+
+    assert layers[0] == full[0]
+
+    for i in range(1, len(layers)):
+        assert layers[i]['nodeCount'] == 11
+        assert 'edgeList' not in layers[i]
+
+        # only the changed metadata is sent
+        assert list(layers[i]['delta']['metadata']['set']) == ['step']
+
+        layers[i] = apply_delta(layers[i - 1], layers[i])
+        assert layers[i] == full[i]
+
+
+def test_delta_layer_contents():
+    web = make_layers_web()
+    previous, layer = web.networks.layers.layers[:2]
+
+    delta = web.networks.layers.get_layer_delta(previous, layer)['delta']
+
+    assert delta['edgeList'] == {'add': [[1, 6]], 'remove': [[1, 2]]}
+    assert delta['nodes'] == {'set': {1: {'group': 7}}, 'remove': [9]}
+
+
+def test_delta_layers_fall_back_to_full_layers():
+    web = Web(title='layers', adjacency=[[0, 1], [1, 2]])
+    network = web.networks.layers
+
+    # everything changed
+    network.add_layer(adjacency=[[3, 4], [4, 5]])
+
+    # the client puts added edges last, which would renumber named nodes
+    network.add_layer(adjacency=[['a', 'b'], ['b', 'c'], ['c', 'd']])
+    network.add_layer(adjacency=[['z', 'a'], ['a', 'b'], ['b', 'c'], ['c', 'd']])
+
+    layers = json.loads("".join(web.iter_json(delta_layers=True)))[
+        'networks']['layers']['layers']
+
+    assert all('delta' not in layer for layer in layers)
+
+
+def resolve_node_tables(data):
+    """rebuilds layers' `nodes` from node tables like the client does"""
+    web_table = data['display'].pop('nodeTable', [])
+
+    for network in data['networks'].values():
+        table = web_table + network.pop('nodeTable', [])
+        for layer in network['layers']:
+            if 'nodeIndexes' in layer:
+                layer['nodes'] = {
+                    str(table[i][0]): table[i][1] for i in layer.pop('nodeIndexes')}
+
+    return data
+
+
+def test_node_tables_rebuild_layers():
+    web = make_layers_web()
+    web.networks.other.add_layer(adjacency=[[0, 1]], nodes={0: {'group': 7}, 1: {'group': 1}})
+
+    full = json.loads(web.json)
+    tabled = json.loads("".join(web.iter_json(intern_nodes=True)))
+
+    # each distinct node is sent once; the nodes both networks have are in the display
+    assert tabled['display']['nodeTable'] == [[0, {'group': 7}], [1, {'group': 1}]]
+    assert len(tabled['networks']['layers']['nodeTable']) == 11
+    assert 'nodes' not in tabled['networks']['layers']['layers'][0]
+
+    assert resolve_node_tables(tabled) == full
+
+
+def test_node_tables_with_delta_layers():
+    web = make_layers_web()
+
+    delta = json.loads("".join(web.iter_json(delta_layers=True)))
+    tabled = json.loads("".join(web.iter_json(delta_layers=True, intern_nodes=True)))
+
+    assert 'nodeTable' not in tabled['display']
+
+    # only the first layer isn't a delta, so there's nothing to share
+    assert tabled == delta
+
+    # unless another network has the same nodes
+    web.networks.other.add_layer(adjacency=[[0, 1]], nodes={0: {'group': 7}})
+    delta = json.loads("".join(web.iter_json(delta_layers=True)))
+    tabled = json.loads("".join(web.iter_json(delta_layers=True, intern_nodes=True)))
+
+    layers = tabled['networks']['layers']['layers']
+    assert [i for i, layer in enumerate(layers) if 'nodeIndexes' in layer] == [0]
+    assert tabled['display']['nodeTable'] == [[0, {'group': 7}]]
+    assert len(tabled['networks']['layers']['nodeTable']) == 9
+
+    assert resolve_node_tables(tabled) == delta
+
+
+def test_layers_do_not_share_node_attributes():
+    nodes = {0: {'group': 1}, 1: {'group': 2}}
+
+    web = Web(title='copied')
+    for _ in range(2):
+        web.networks.copied.add_layer(adjacency=[[0, 1]], nodes=nodes)
+
+    first, second = [layer['nodes'] for layer in web.networks.copied.layers]
+    assert first == second == nodes
+    assert first[0] is not second[0] and first[0] is not nodes[0]
+
+    # editing one layer doesn't change another
+    second[0]['group'] = 3
+    assert first[0] == {'group': 1}
+
+    # without copying, each layer keeps the caller's own objects
+    web.networks.owned.add_layer(adjacency=[[0, 1]], nodes=nodes, copy=False)
+    web.networks.owned.add_layer(
+        adjacency=[[0, 1]], nodes={0: {'group': 1}, 1: nodes[1]}, copy=False)
+
+    first, second = [layer['nodes'] for layer in web.networks.owned.layers]
+    assert first is nodes
+    assert second[0] is not nodes[0] and second[1] is nodes[1]
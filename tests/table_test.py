@@ -0,0 +1,92 @@
+from webweb import Web
+from webweb.webweb import EdgeList, Network
+import pytest
+
+
+def test_dataframe_edges_and_node_table():
+    pandas = pytest.importorskip('pandas')
+
+    edges = pandas.DataFrame({
+        'from': ['a', 'b', 'c'],
+        'to': ['b', 'c', 'e'],
+        'strength': [0.5, 1.0, 2.0],
+    })
+    nodes = pandas.DataFrame({
+        'name': ['d', 'a', 'b'],
+        'group': ['x', 'y', 'y'],
+        'size': [1, 2, 3],
+    })
+
+    network = Network()
+    network.add_layer(
+        adjacency=edges,
+        node_table=nodes,
+        columns={'source': 'from', 'target': 'to', 'weight': 'strength',
+                 'id': 'name'},
+    )
+    layer = network.layers[0]
+
+    assert isinstance(layer['edgeList'], EdgeList)
+    assert layer['edgeList'] == [[0, 1, 0.5], [1, 2, 1.0], [2, 3, 2.0]]
+
+    # `d` has no edges, so it comes last
+    metadata = layer['metadata']
+    assert metadata['name']['values'] == ['a', 'b', 'c', 'e', 'd']
+    assert metadata['group']['values'] == ['y', 'y', None, None, 'x']
+    assert metadata['size']['values'] == [2, 3, None, None, 1]
+
+
+def test_dataframe_with_default_columns_and_no_node_column():
+    pandas = pytest.importorskip('pandas')
+
+    edges = pandas.DataFrame({'source': [0, 1], 'target': [1, 2]})
+    nodes = pandas.DataFrame({'size': [5, 6, 7, 8]})
+
+    web = Web(title='table', adjacency=edges)
+    assert web.networks.table.layers[0]['edgeList'] == [[0, 1], [1, 2]]
+
+    web.networks.table.add_layer(adjacency=edges, node_table=nodes)
+    layer = web.networks.table.layers[1]
+    assert layer['edgeList'].weight is None
+    assert layer['metadata']['name']['values'] == [0, 1, 2, 3]
+    assert layer['metadata']['size']['values'] == [5, 6, 7, 8]
+
+
+def test_arrow_table_matches_dataframe():
+    pandas = pytest.importorskip('pandas')
+    pyarrow = pytest.importorskip('pyarrow')
+
+    edges = pandas.DataFrame({
+        'source': ['a', 'b'], 'target': ['b', 'c'], 'weight': [1.5, 2.5],
+    })
+    nodes = pandas.DataFrame({'id': ['c', 'a'], 'group': [1, 2]})
+
+    from_pandas = Network()
+    from_pandas.add_layer(adjacency=edges, node_table=nodes)
+
+    from_arrow = Network()
+    from_arrow.add_layer(adjacency=pyarrow.Table.from_pandas(edges),
+                         node_table=pyarrow.Table.from_pandas(nodes))
+
+    assert from_arrow.layers == from_pandas.layers
+
+
+def test_node_table_with_list_edges():
+    pandas = pytest.importorskip('pandas')
+
+    nodes = pandas.DataFrame({'id': ['a', 'b', 'd'], 'size': [1, 2, 4]})
+
+    network = Network()
+    network.add_layer(adjacency=[['a', 'b'], ['b', 'c', 2]], node_table=nodes)
+    network.add_layer(adjacency=[[0, 1, 0], [1, 0, 0], [0, 0, 0]],
+                      adjacency_type='matrix',
+                      node_table=pandas.DataFrame({'size': [5, 6, 7]}))
+
+    listed, matrix = network.layers
+
+    assert listed['edgeList'] == [[0, 1, 1], [1, 2, 2]]
+    assert listed['metadata']['name']['values'] == ['a', 'b', 'c', 'd']
+    assert listed['metadata']['size']['values'] == [1, 2, None, 4]
+
+    assert matrix['edgeList'] == [[1, 0]]
+    assert matrix['metadata']['size']['values'] == [5, 6, 7]
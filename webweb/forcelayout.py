@@ -0,0 +1,591 @@
+# a numpy version of the client's d3 force simulation.
+#
+# the client runs `d3.forceSimulation` with center, many-body ("charge"),
+# x/y ("gravity") and link forces until it cools. This runs the same forces
+# with the same display parameters, so that a layout can be computed once in
+# python and handed to the client, which then doesn't need to simulate.
+#
+# positions are centered on the origin; the client shifts them to the middle
+# of its canvas.
+from pathlib import Path
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+
+# the client's display defaults
+PARAMETERS = {
+    'c': 60,
+    'g': 0.1,
+    'l': 20,
+    'linkStrength': 1,
+}
+
+# the client's longer names for those parameters. it uses the short name's
+# value when both are set (see `standardizeDisplayParameterSynonyms`)
+PARAMETER_SYNONYMS = {
+    'c': 'charge',
+    'g': 'gravity',
+    'l': 'linkLength',
+}
+
+# d3's simulation defaults. alpha decays from 1 to ALPHA_MIN in 300 ticks
+ALPHA_MIN = 0.001
+ALPHA_DECAY = 1 - ALPHA_MIN ** (1 / 300)
+VELOCITY_DECAY = 0.4
+
+# the starting alpha for a layout that starts from the layout of a similar
+# graph (eg, the previous layer of a network). It's low enough that nodes
+# mostly stay where they were
+WARM_START_ALPHA = .1
+
+# d3 places nodes on a phyllotaxis spiral to start
+INITIAL_RADIUS = 10
+INITIAL_ANGLE = np.pi * (3 - np.sqrt(5))
+
+# up to this many nodes, charge is computed exactly between every pair of
+# nodes. Above it, charges are spread onto a grid and the field is computed
+# with an fft
+EXACT_CHARGE_LIMIT = 500
+
+# rows of the pairwise distance matrix to compute at a time
+EXACT_CHARGE_BLOCK_SIZE = 256
+
+# bounds on the number of grid cells per side, which is a power of 2 (so the
+# ffts are fast)
+MIN_GRID_SIZE = 32
+MAX_GRID_SIZE = 256
+
+# grid cell sizes are rounded up to a power of this, so that the fft of the
+# field's kernel can be reused from tick to tick
+GRID_SCALE_STEP = 2 ** .25
+
+# how many bytes of layouts `LayoutCache` keeps by default
+DEFAULT_CACHE_SIZE = 2 ** 28
+
+# part of every cache key. change it when layouts computed by an older version
+# shouldn't be reused
+CACHE_VERSION = 1
+
+
+################################################################################
+#
+#
+#
+#
+#
+#
+#                                   Interface
+#
+#
+#
+#
+#
+#
+################################################################################
+def get_display_parameters(display):
+    """returns the layout parameters set in a dict of display parameters,
+    reading their synonyms like the client does"""
+    parameters = {}
+    for key in PARAMETERS:
+        value = display.get(key)
+
+        if value is None and key in PARAMETER_SYNONYMS:
+            value = display.get(PARAMETER_SYNONYMS[key])
+
+        if value is not None:
+            parameters[key] = value
+
+    return parameters
+
+
+def get_layout(source, target, node_count, weight=None, positions=None,
+               alpha=1, exact_charge_limit=EXACT_CHARGE_LIMIT, seed=0,
+               **parameters):
+    """returns an array of (x, y) positions for `node_count` nodes.
+
+    parameters:
+    - `source`, `target`: sequences of node indexes, one per edge
+    - `node_count`: int. the number of nodes
+    - `weight`: sequence of edge weights. As in the client, edges between the
+      same pair of nodes are merged, and pairs whose weights sum to 0 aren't
+      linked
+    - `positions`: array of starting positions. default is None. If None,
+      nodes start on the spiral d3 uses. Nodes whose positions are NaN start
+      next to their neighbors (see `place_missing_nodes`)
+    - `alpha`: the simulation's starting "temperature". default is 1. Lower
+      values move nodes less; use them when `positions` are close to done
+      (`WARM_START_ALPHA` is for positions from a similar graph's layout)
+    - `exact_charge_limit`: int. graphs with more nodes than this approximate
+      the charge force on a grid
+    - `seed`: seeds the small random moves that separate nodes that sit on
+      top of each other
+    - `parameters`: the display parameters: `c` (charge), `g` (gravity), `l`
+      (link length) and `linkStrength`. see `PARAMETERS` for the defaults
+    """
+    parameters = dict(PARAMETERS, **parameters)
+    random = np.random.default_rng(seed)
+
+    source, target = get_links(source, target, node_count, weight)
+    link_bias = get_link_bias(source, target, node_count)
+
+    if positions is None:
+        positions = get_initial_positions(node_count)
+    else:
+        positions = np.array(positions, dtype=float).reshape(node_count, 2)
+        place_missing_nodes(positions, source, target, random)
+
+    velocities = np.zeros_like(positions)
+
+    if node_count <= exact_charge_limit:
+        charge_field = get_exact_charge_field
+    else:
+        charge_field = GridChargeField(node_count, parameters['l'])
+
+    while alpha >= ALPHA_MIN:
+        alpha += (0 - alpha) * ALPHA_DECAY
+
+        # center
+        positions -= positions.mean(axis=0)
+
+        # charge
+        velocities += parameters['c'] * alpha * charge_field(positions)
+
+        # gravity
+        velocities -= parameters['g'] * alpha * positions
+
+        # links
+        apply_link_force(
+            positions, velocities, source, target, link_bias, alpha,
+            parameters['l'], parameters['linkStrength'], random)
+
+        velocities *= 1 - VELOCITY_DECAY
+        positions += velocities
+
+    return positions - positions.mean(axis=0)
+
+
+################################################################################
+#
+#
+#
+#
+#
+#
+#                                   Forces
+#
+#
+#
+#
+#
+#
+################################################################################
+def get_initial_positions(node_count):
+    index = np.arange(node_count)
+    radius = INITIAL_RADIUS * np.sqrt(.5 + index)
+    angle = index * INITIAL_ANGLE
+    return np.column_stack([radius * np.cos(angle), radius * np.sin(angle)])
+
+
+def place_missing_nodes(positions, source, target, random):
+    """places the nodes whose positions are NaN near the average position of
+    their placed neighbors, or (if they have none) on the initial spiral.
+    `positions` is changed in place"""
+    missing = np.isnan(positions).any(axis=1)
+
+    if not missing.any():
+        return
+
+    placed = ~missing
+    node_count = len(positions)
+
+    neighbor_totals = np.zeros_like(positions)
+    neighbor_counts = np.zeros(node_count)
+    for node, neighbor in [(source, target), (target, source)]:
+        known = placed[neighbor]
+        neighbor_counts += np.bincount(node[known], minlength=node_count)
+        for axis in range(2):
+            neighbor_totals[:, axis] += np.bincount(
+                node[known], weights=positions[neighbor[known], axis],
+                minlength=node_count)
+
+    has_neighbors = missing & (neighbor_counts > 0)
+    positions[has_neighbors] = (
+        neighbor_totals[has_neighbors] / neighbor_counts[has_neighbors, None] +
+        (random.random((has_neighbors.sum(), 2)) - .5) * INITIAL_RADIUS)
+
+    alone = missing & ~has_neighbors
+    positions[alone] = get_initial_positions(node_count)[alone]
+
+
+def get_links(source, target, node_count, weight=None):
+    """merges edges into links between distinct pairs of nodes, as the client
+    does. self loops are dropped: they don't move anything.
+
+    returns (source, target) arrays"""
+    source = np.asarray(source, dtype=np.int64)
+    target = np.asarray(target, dtype=np.int64)
+
+    low = np.minimum(source, target)
+    high = np.maximum(source, target)
+    pairs = low * node_count + high
+
+    if weight is None:
+        weight = np.ones(len(pairs))
+
+    pairs, index = np.unique(pairs, return_inverse=True)
+    weight = np.bincount(
+        index.ravel(), weights=np.asarray(weight, dtype=float),
+        minlength=len(pairs))
+
+    pairs = pairs[(weight != 0) & (pairs // node_count != pairs % node_count)]
+    return pairs // node_count, pairs % node_count
+
+
+def get_link_bias(source, target, node_count):
+    """d3 moves the lower degree end of a link further"""
+    degree = np.bincount(source, minlength=node_count) + np.bincount(
+        target, minlength=node_count)
+    return degree[source] / (degree[source] + degree[target])
+
+
+def apply_link_force(positions, velocities, source, target, bias, alpha,
+                     distance, strength, random):
+    """pulls (or pushes) linked nodes towards being `distance` apart.
+
+    d3 applies links one at a time; they're applied all at once here."""
+    if not len(source):
+        return
+
+    delta = (positions[target] + velocities[target] -
+             positions[source] - velocities[source])
+
+    coincident = ~delta.any(axis=1)
+    if coincident.any():
+        delta[coincident] = jiggle(random, (coincident.sum(), 2))
+
+    length = np.hypot(delta[:, 0], delta[:, 1])
+    delta *= ((length - distance) / length * alpha * strength)[:, None]
+
+    node_count = len(positions)
+    for axis in range(2):
+        velocities[:, axis] -= np.bincount(
+            target, weights=delta[:, axis] * bias, minlength=node_count)
+        velocities[:, axis] += np.bincount(
+            source, weights=delta[:, axis] * (1 - bias), minlength=node_count)
+
+
+def jiggle(random, shape):
+    return (random.random(shape) - .5) * 1e-6
+
+
+def get_charge_scale(dx, dy):
+    """the push a unit charge gives at an offset of (dx, dy) is the offset
+    times this. d3 softens it for nodes less than 1 apart, and nodes don't
+    push themselves"""
+    scale = dx * dx + dy * dy
+
+    close = scale < 1
+    scale[close] = np.sqrt(scale[close])
+    scale[scale == 0] = np.inf
+
+    return np.reciprocal(scale, out=scale)
+
+
+def get_exact_charge_field(positions):
+    """sums the push every node gets from every other node"""
+    field = np.empty_like(positions)
+
+    for start in range(0, len(positions), EXACT_CHARGE_BLOCK_SIZE):
+        block = positions[start:start + EXACT_CHARGE_BLOCK_SIZE]
+        dx = block[:, None, 0] - positions[None, :, 0]
+        dy = block[:, None, 1] - positions[None, :, 1]
+        scale = get_charge_scale(dx, dy)
+
+        field[start:start + len(block), 0] = np.einsum('ij,ij->i', dx, scale)
+        field[start:start + len(block), 1] = np.einsum('ij,ij->i', dy, scale)
+
+    return field
+
+
+class GridChargeField(object):
+    """approximates the charge field by spreading each node's charge onto the
+    4 corners of its grid cell, convolving the grid with the charge kernel (by
+    fft), and reading the field back off of the corners.
+
+    cells are about half a link long, up to `MAX_GRID_SIZE` cells a side;
+    nodes closer than a cell push each other less than they should.
+    """
+
+    def __init__(self, node_count, link_distance):
+        size = 2 ** int(np.ceil(np.log2(4 * np.sqrt(node_count))))
+        self.grid_size = int(np.clip(size, MIN_GRID_SIZE, MAX_GRID_SIZE))
+        self.target_cell_size = max(link_distance / 2, 1)
+        self.kernels = {}
+
+    def __call__(self, positions):
+        low = positions.min(axis=0)
+        span = (positions.max(axis=0) - low).max()
+
+        grid_size = self.grid_size
+        cell_size = self.get_cell_size(span)
+
+        # each node's cell, and how far across it the node is
+        cells = (positions - low) / cell_size
+        corner = np.minimum(cells.astype(np.int64), grid_size - 2)
+        offset = cells - corner
+
+        corners, weights = [], []
+        for dx, dy in [(0, 0), (1, 0), (0, 1), (1, 1)]:
+            corners.append((corner[:, 0] + dx) * grid_size + corner[:, 1] + dy)
+            weights.append(
+                np.abs(1 - dx - offset[:, 0]) * np.abs(1 - dy - offset[:, 1]))
+
+        charge = np.bincount(
+            np.concatenate(corners), weights=np.concatenate(weights),
+            minlength=grid_size ** 2).reshape(grid_size, grid_size)
+
+        padded_size = 2 * grid_size
+        charge = np.fft.rfft2(charge, s=(padded_size, padded_size))
+        kernel_x, kernel_y = self.get_kernel(cell_size)
+
+        field = np.empty_like(positions)
+        for axis, kernel in enumerate([kernel_x, kernel_y]):
+            grid = np.fft.irfft2(charge * kernel, s=(padded_size, padded_size))
+            grid = grid[:grid_size, :grid_size].ravel()
+
+            field[:, axis] = sum(
+                weight * grid[index] for index, weight in zip(corners, weights))
+
+        return field
+
+    def get_cell_size(self, span):
+        """rounds the cell size up to a power of `GRID_SCALE_STEP`"""
+        cell_size = max(self.target_cell_size, span / (self.grid_size - 2))
+        step = np.ceil(np.log(cell_size) / np.log(GRID_SCALE_STEP))
+        return GRID_SCALE_STEP ** step
+
+    def get_kernel(self, cell_size):
+        """the fft of the charge kernel over every offset between cells.
+        offsets are laid out so that the convolution doesn't wrap around"""
+        if cell_size not in self.kernels:
+            padded_size = 2 * self.grid_size
+            offsets = np.fft.fftfreq(padded_size, 1 / padded_size) * cell_size
+            dx, dy = np.meshgrid(offsets, offsets, indexing='ij')
+
+            scale = get_charge_scale(dx, dy)
+
+            self.kernels[cell_size] = (
+                np.fft.rfft2(dx * scale), np.fft.rfft2(dy * scale))
+
+        return self.kernels[cell_size]
+
+
+################################################################################
+#
+#
+#
+#
+#
+#
+#                                   Cache
+#
+#
+#
+#
+#
+#
+################################################################################
+def get_layout_cache(cache):
+    """returns a `LayoutCache` in the default directory if `cache` is True,
+    and `cache` otherwise"""
+    return LayoutCache() if cache is True else cache
+
+
+class LayoutCache(object):
+    """keeps layouts on disk, so that a graph is only laid out once.
+
+    layouts are keyed by a hash of everything that goes into them: the edges,
+    the node count and names, and the layout parameters. Each is stored as an
+    `.npz` file. When the files add up to more than `max_size` bytes, the
+    least recently used are deleted.
+
+    usage:
+    - `cache = LayoutCache()`
+    - `positions = cache.get_layout(source, target, node_count)`
+    - `cache.clear()`
+    """
+
+    def __init__(self, path=None, max_size=DEFAULT_CACHE_SIZE):
+        """parameters:
+        - `path`: the cache's directory. default is None, which uses
+          `get_default_path`
+        - `max_size`: int. bytes. default is `DEFAULT_CACHE_SIZE`
+        """
+        self.path = Path(path) if path is not None else self.get_default_path()
+        self.max_size = max_size
+
+        # bytes of cached layouts, counted on the first write and kept up to
+        # date after that, so that writes don't have to list the directory
+        self.known_size = None
+
+    @staticmethod
+    def get_default_path():
+        """`$XDG_CACHE_HOME/webweb/layouts`, or `~/.cache/webweb/layouts`"""
+        cache_home = os.environ.get('XDG_CACHE_HOME')
+
+        if not cache_home:
+            cache_home = Path.home().joinpath('.cache')
+
+        return Path(cache_home, 'webweb', 'layouts')
+
+    def get_layout(self, source, target, node_count, weight=None, names=None,
+                   **arguments):
+        """returns the cached layout of the graph, computing (and caching) it
+        first if it isn't there.
+
+        parameters:
+        - `names`: sequence of node names. default is None. Layouts of graphs
+          whose nodes are named differently are kept apart
+        - see `get_layout` for the rest
+        """
+        key = self.get_key(source, target, node_count, weight, names,
+                           **arguments)
+
+        positions = self.get(key)
+
+        if positions is None:
+            positions = get_layout(source, target, node_count, weight,
+                                   **arguments)
+            self.set(key, positions)
+
+        return positions
+
+    @staticmethod
+    def get_key(source, target, node_count, weight=None, names=None,
+                **arguments):
+        """a hash of a layout's graph and parameters"""
+        positions = arguments.pop('positions', None)
+        arguments['parameters'] = dict(PARAMETERS, **{
+            key: arguments.pop(key) for key in list(arguments)
+            if key in PARAMETERS
+        })
+
+        key = hashlib.sha256()
+        key.update(json.dumps(
+            [CACHE_VERSION, node_count, names, arguments],
+            sort_keys=True,
+            default=str,
+        ).encode())
+
+        for values, dtype in [(source, np.int64), (target, np.int64),
+                              (weight, float), (positions, float)]:
+            if values is not None:
+                key.update(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+            # separates arrays, so that (say) `weight` and `positions` can't
+            # be confused
+            key.update(b'|')
+
+        return key.hexdigest()
+
+    def get_file(self, key):
+        return self.path.joinpath(key + '.npz')
+
+    def get(self, key):
+        """returns the positions cached under `key`, or None"""
+        path = self.get_file(key)
+
+        try:
+            with np.load(path) as data:
+                positions = data['positions']
+        except (OSError, KeyError, ValueError):
+            return None
+
+        # reading a layout makes it the most recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return positions
+
+    def set(self, key, positions):
+        """caches `positions` under `key`, then evicts old layouts if the cache
+        is over `max_size`"""
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        if self.known_size is None:
+            self.known_size = self.size
+
+        path = self.get_file(key)
+        try:
+            self.known_size -= path.stat().st_size
+        except FileNotFoundError:
+            pass
+
+        # written to a temporary file first, so that a reader never sees half
+        # of a layout
+        descriptor, temporary_path = tempfile.mkstemp(
+            dir=str(self.path), suffix='.tmp')
+
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                np.savez(f, positions=positions)
+
+            self.known_size += os.path.getsize(temporary_path)
+            os.replace(temporary_path, str(path))
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+        if self.known_size > self.max_size:
+            self.evict()
+
+    def get_files(self):
+        """returns the cache's files, least recently used first"""
+        files = []
+        for path in self.path.glob('*.npz'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        return sorted(files)
+
+    @property
+    def size(self):
+        """bytes of cached layouts"""
+        return sum(size for _, size, _ in self.get_files())
+
+    def evict(self):
+        """deletes the least recently used layouts until the cache fits in
+        `max_size` bytes"""
+        files = self.get_files()
+        size = sum(size for _, size, _ in files)
+
+        for _, file_size, path in files:
+            if size <= self.max_size:
+                break
+
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+            size -= file_size
+
+        self.known_size = size
+
+    def clear(self):
+        """deletes every cached layout"""
+        for _, _, path in self.get_files():
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+        self.known_size = 0
@@ -1,5 +1,21 @@
 # reference:
 # https://www.fim.uni-passau.de/fileadmin/files/lehrstuhl/brandenburg/projekte/gml/gml-technical-report.pdf
+from collections.abc import Iterable
+import contextlib
+import io
+import itertools
+import mmap
+import os
+import re
+
+# number of characters the tokenizer reads at a time
+CHUNK_SIZE = 2 ** 20
+
+# the writer's file buffer size, and how many lines it joins per write
+WRITE_BUFFER_SIZE = 2 ** 20
+WRITE_BATCH_SIZE = 1000
+GML_INDENT = '    '
+
 
 ################################################################################
 #
@@ -16,15 +32,21 @@
 #
 #
 ################################################################################
-def get_gml(filename, validate=True):
+def get_gml(filename, validate=True, parser='tokens', memory_map=False):
     """returns a dictified representation of some gml
 
     note: comments are removed
 
     parameters:
-    - filename: string. path of file
+    - filename: string. path of file, or a bytes-like buffer of utf-8 gml
+    (`bytes`, `bytearray`, `memoryview`, or an `mmap.mmap`)
     - validate: boolean. default is True. If true, will check that ids are
     unduplicated and that edges have `source` and `target` attributes
+    - parser: string. default is 'tokens'. 'tokens' reads the file in a single
+    pass; 'lines' uses the older line by line parser, which skips lines it
+    can't read instead of raising a `GMLParseError`
+    - memory_map: boolean. default is False. If true, the (utf-8) file is
+    memory mapped and parsed in place, so its text is never held in memory
 
     format:
     {
@@ -53,14 +75,42 @@ def get_gml(filename, validate=True):
         
     }
     """
-    content = get_raw_gml(filename, validate)
+    content = get_raw_gml(filename, validate, parser, memory_map)
     formatted = format_gml_dict(content)
     return formatted
 
 
-def get_raw_gml(filename, validate=True):
-    with open(filename, 'r') as f:
-        lines = [l.strip() for l in f.readlines()]
+def get_raw_gml(filename, validate=True, parser='tokens', memory_map=False):
+    """returns the gml as a list of (key, value) tuples, where list values are
+    themselves lists of (key, value) tuples. comments are kept.
+
+    see `get_gml` for the parameters.
+    """
+    if parser == 'tokens':
+        return get_raw_gml_from_tokens(filename, validate, memory_map)
+    elif parser == 'lines':
+        return get_raw_gml_from_lines(filename, validate)
+
+    raise ValueError("unknown gml parser: {}".format(parser))
+
+
+def get_raw_gml_from_tokens(filename, validate=True, memory_map=False):
+    with open_tokens(filename, memory_map=memory_map) as tokens:
+        formatted = parse_tokens(tokens)
+
+    if validate:
+        validate_raw_gml(formatted)
+
+    return formatted
+
+
+def get_raw_gml_from_lines(filename, validate=True):
+    if is_path(filename):
+        with open(filename, 'r') as f:
+            lines = [l.strip() for l in f.readlines()]
+    else:
+        lines = [l.strip() for l in
+                 bytes(filename).decode('utf-8').splitlines()]
 
     parsed = []
     while lines:
@@ -73,14 +123,100 @@ def get_raw_gml(filename, validate=True):
     return formatted
 
 
+def iter_gml(filename, validate=True, chunk_size=CHUNK_SIZE):
+    """yields the contents of a gml file one piece at a time, as (kind, value)
+    tuples, without reading the whole file into memory:
+    - ('graph', header): the start of a graph. `header` is a dict of the
+      graph's attributes that come before its first node or edge
+    - ('node', node): a node's attribute dict, as in `get_gml`
+    - ('edge', edge): an edge's attribute dict, as in `get_gml`
+    - ('attribute', (key, value)): any other attribute. these are either
+      outside of a graph, or come after the first node or edge of the graph
+      they're in
+
+    comments are skipped.
+
+    parameters:
+    - filename: string. path of file, or a bytes-like buffer (see `get_gml`)
+    - validate: boolean. default is True. If true, will check that node ids
+    are unduplicated within each graph and that edges have `source` and
+    `target` attributes. (this keeps a set of each graph's ids)
+    - chunk_size: int. number of characters to read at a time
+    """
+    with open_tokens(filename, chunk_size) as tokens:
+        for key, kind, value in iter_items(tokens):
+            if key == 'graph' and kind == 'open':
+                yield from iter_graph(tokens, validate)
+            else:
+                yield 'attribute', (key, read_value(tokens, kind, value))
+
+
+def iter_gml_graphs(filename, validate=True, chunk_size=CHUNK_SIZE):
+    """yields (header, elements) for each graph in a gml file, where `header`
+    is as in `iter_gml` and `elements` iterates over the graph's remaining
+    `iter_gml` events.
+
+    `elements` is only valid until the next graph is asked for. attributes
+    outside of graphs are skipped.
+    """
+    with open_tokens(filename, chunk_size) as tokens:
+        for key, kind, value in iter_items(tokens):
+            if key == 'graph' and kind == 'open':
+                elements = iter_graph(tokens, validate)
+                _, header = next(elements)
+
+                yield header, elements
+
+                # skip whatever of the graph wasn't read
+                for _ in elements:
+                    pass
+            else:
+                read_value(tokens, kind, value)
+
+
+def get_graph_spans(filename):
+    """returns a list of (start, end) byte offsets for each top level graph in
+    a gml file (or bytes-like buffer), from its `graph` key to its closing
+    `]`, without parsing the graphs.
+
+    each span can be read as gml on its own:
+
+    >>> gml = b'Creator "me" graph [ label "[a]" ] # graph [\\ngraph [ id 1 ]'
+    >>> [gml[start:end] for start, end in get_graph_spans(gml)]
+    [b'graph [ label "[a]" ]', b'graph [ id 1 ]']
+    """
+    if not is_path(filename):
+        return find_graph_spans(filename)
+
+    with open(filename, 'rb') as f:
+        # empty files can't be mapped
+        if not os.fstat(f.fileno()).st_size:
+            return []
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return find_graph_spans(buffer)
+
+
 def write_gml(content, filename):
-    if type(content) == dict:
-        content = convert_gml_dict_to_tuple_list(content)
+    """writes gml to `filename`, a path or a writable text file object, one
+    attribute at a time.
+
+    `content` is either:
+    - a dict, formatted as in `get_gml`. graphs are written after the other
+      attributes, and a graph's nodes and edges after its other attributes
+    - a list of (key, value) tuples, as in `get_raw_gml`
 
-    to_write = [create_element(k, v).write() for k, v in content]
+    any list in `content` (a graph's nodes and edges, for instance) can be
+    an iterable such as a generator, so large graphs don't have to be built
+    in memory before they're written. `content` isn't modified.
+    """
+    entries = iter_gml_entries(content)
 
-    with open(filename, 'w') as f:
-        f.write("\n".join(to_write) + "\n")
+    if is_path(filename):
+        with open(filename, 'w', buffering=WRITE_BUFFER_SIZE) as f:
+            write_gml_entries(entries, f)
+    else:
+        write_gml_entries(entries, filename)
 
 
 ################################################################################
@@ -99,19 +235,34 @@ def write_gml(content, filename):
 #
 ################################################################################
 def format_gml_dict(value):
+    """turns a (key, value) tuple list into a dict. list values become lists
+    of dicts, keyed by their key. comments are removed.
+
+    >>> format_gml_dict([('graph', [('node', [('id', 1)]), ('node', [('id', 2)])]), ('comment', '# hi')])
+    {'graph': [{'node': [{'id': 1}, {'id': 2}]}]}
+    """
     formatted = {}
-    if type(value) == list:
+    if type(value) != list:
+        return formatted
+
+    # (tuple list, dict to fill) pairs; a stack instead of recursion
+    stack = [(value, formatted)]
+    while stack:
+        value, formatted_value = stack.pop()
+
         for key, subvalue in value:
             if key == 'comment':
                 continue
 
             if type(subvalue) != list:
-                formatted[key] = subvalue
+                formatted_value[key] = subvalue
             else:
-                if not formatted.get(key):
-                    formatted[key] = []
+                if not formatted_value.get(key):
+                    formatted_value[key] = []
 
-                formatted[key].append(format_gml_dict(subvalue))
+                formatted_subvalue = {}
+                formatted_value[key].append(formatted_subvalue)
+                stack.append((subvalue, formatted_subvalue))
 
     return formatted
 
@@ -150,11 +301,156 @@ def to_tuple_list(item):
     return converted
 
 
+def iter_gml_entries(content, kind=None):
+    """yields (key, value, is_list) for each attribute of `content` (see
+    `write_gml`). if `is_list`, `value` is an iterator of the list's entries.
+
+    `kind` is the key of the list `content` is the value of.
+    """
+    if isinstance(content, dict):
+        yield from iter_gml_dict_entries(content, kind)
+    else:
+        for entry in content:
+            try:
+                key, value = entry
+            except (TypeError, ValueError):
+                raise TypeError(
+                    "can't write {!r} in {} as gml: list entries must be "
+                    "(key, value) pairs".format(entry, kind or 'the file'))
+
+            if isinstance(value, dict):
+                yield key, iter_gml_dict_entries(value, key), True
+            elif is_gml_list(value):
+                yield key, iter_gml_entries(value, key), True
+            else:
+                yield key, value, False
+
+
+def iter_gml_dict_entries(content, kind=None):
+    # graphs come last in a file, and nodes and edges come last in a graph
+    if kind is None:
+        last_keys = ['graph']
+    elif kind == 'graph':
+        last_keys = ['node', 'edge']
+    else:
+        last_keys = []
+
+    for key, value in content.items():
+        if key not in last_keys:
+            yield from get_gml_dict_entries(key, value)
+
+    for key in last_keys:
+        if key in content:
+            yield from get_gml_dict_entries(key, content[key])
+
+
+def get_gml_dict_entries(key, value):
+    """a dict's list values are lists of repeated attributes (usually dicts)"""
+    value_type = type(value)
+    if value_type is int or value_type is float or value_type is str:
+        return [(key, value, False)]
+    elif isinstance(value, dict):
+        return [(key, iter_gml_dict_entries(value, key), True)]
+    elif is_gml_list(value):
+        return ((key, subvalue, False) if not isinstance(subvalue, dict) else
+                (key, iter_gml_dict_entries(subvalue, key), True)
+                for subvalue in value)
+    else:
+        return [(key, value, False)]
+
+
+def is_gml_list(value):
+    return isinstance(value, Iterable) and not isinstance(value, (str, bytes))
+
+
+def write_gml_entries(entries, f):
+    """writes `iter_gml_entries` entries to the file `f`, indenting each list
+    by four spaces. lists are walked with a stack instead of recursion, and
+    lines are written in batches"""
+    lines = []
+
+    # (entries, indentation) of the lists being written
+    stack = [(entries, '')]
+
+    while stack:
+        entries, indent = stack[-1]
+
+        for key, value, is_list in entries:
+            if not is_list:
+                lines.append(indent + format_gml_attribute(key, value))
+            else:
+                first = next(value, None)
+
+                if first is None:
+                    lines.append(indent + key + ' []')
+                else:
+                    lines.append(indent + key + ' [')
+                    stack.append((itertools.chain([first], value),
+                                  indent + GML_INDENT))
+                    break
+
+            if len(lines) >= WRITE_BATCH_SIZE:
+                f.write("\n".join(lines) + "\n")
+                lines = []
+        else:
+            stack.pop()
+
+            if stack:
+                lines.append(stack[-1][1] + ']')
+
+    if lines:
+        f.write("\n".join(lines) + "\n")
+
+
+def format_gml_attribute(key, value):
+    """
+    >>> format_gml_attribute('label', 'a b')
+    'label "a b"'
+    >>> format_gml_attribute('comment', '# a comment')
+    '# a comment'
+    >>> format_gml_attribute('weight', 0.5)
+    'weight 0.5'
+    >>> format_gml_attribute('directed', True)
+    'directed 1'
+    >>> format_gml_attribute('tag', '#x')
+    'tag "#x"'
+    """
+    value_type = type(value)
+    if value_type is int or value_type is float:
+        return key + ' ' + str(value)
+
+    # numpy scalars and the like
+    if not isinstance(value, (str, int, float)) and hasattr(value, 'item'):
+        value = value.item()
+
+    if isinstance(value, str):
+        if key == 'comment' and value.startswith('#'):
+            return value
+
+        check_gml_string(value)
+        return '{} "{}"'.format(key, value)
+    elif isinstance(value, bool):
+        return '{} {}'.format(key, int(value))
+    elif isinstance(value, (int, float)):
+        return '{} {}'.format(key, value)
+
+    raise TypeError("can't write {!r} ({}) as gml".format(
+        value, type(value).__name__))
+
+
+def check_gml_string(value):
+    """gml strings can't contain quotes"""
+    if '"' in value:
+        raise ValueError("can't write {!r} as gml: it contains a '\"'".format(
+            value))
+
+
 def create_element(key, value):
     if type(value) is str:
-        if value.startswith('#'):
+        if key == 'comment' and value.startswith('#'):
             return LineComment(value=value)
         else:
+            check_gml_string(value)
             return StringAttribute(key=key, value=value)
     elif type(value) is int:
         return IntegerAttribute(key=key, value=value)
@@ -680,64 +976,100 @@ def parse_lines(lines):
 
 
 def format_parsed_content(parsed, validate=True):
-    all_attributes = []
-    for attribute in parsed:
-        key = attribute.key
-        if key == 'graph':
-            graph_attributes = []
+    all_attributes = [(attribute.key, format_value(attribute))
+                      for attribute in parsed]
 
-            for sub in attribute.value:
-                value = format_value(sub)
-                if sub.key == 'edge':
-                    if validate and not edge_is_valid(value):
-                        raise EdgeError
+    if validate:
+        validate_raw_gml(all_attributes)
 
-                graph_attributes.append((sub.key, value))
+    return all_attributes
 
-            all_attributes.append(('graph', graph_attributes))
-        else:
-            all_attributes.append((key, format_value(attribute)))
 
-    if validate:
-        ids_are_valid(all_attributes)
+def validate_raw_gml(content):
+    for key, value in content:
+        if key == 'graph' and type(value) == list:
+            for sub_key, sub_value in value:
+                if sub_key == 'edge' and not edge_is_valid(sub_value):
+                    raise EdgeError
 
-    return all_attributes
+    ids_are_valid(content)
 
 
 def format_value(attribute):
-    if type(attribute) == ListAttribute:
-        return [(sub.key, format_value(sub)) for sub in attribute.value]
-    else:
+    if type(attribute) != ListAttribute:
         return attribute.value
 
+    formatted = []
+
+    # (attribute, list to fill) pairs; a stack instead of recursion
+    stack = [(attribute, formatted)]
+    while stack:
+        attribute, formatted_value = stack.pop()
+
+        for sub in attribute.value:
+            if type(sub) == ListAttribute:
+                formatted_sub = []
+                stack.append((sub, formatted_sub))
+                formatted_value.append((sub.key, formatted_sub))
+            else:
+                formatted_value.append((sub.key, sub.value))
+
+    return formatted
+
 
 def ids_are_valid(content):
-    ids_dict = {}
-    for _id in get_ids(content):
-        if not ids_dict.get(_id):
-            ids_dict[_id] = True
+    """raises a DuplicateIdsError if an id is repeated within a graph, or among
+    the attributes outside of graphs
+
+    >>> ids_are_valid([('graph', [('node', [('id', 1)])]), ('graph', [('node', [('id', 1)])])])
+    >>> ids_are_valid([('graph', [('node', [('id', 1)]), ('node', [('id', 1)])])])
+    Traceback (most recent call last):
+    ...
+    pygmlion.DuplicateIdsError: duplicate id: 1
+    """
+    outside_of_graphs = []
+    for key, value in content:
+        if key == 'graph' and type(value) == list:
+            ids_are_unique(value)
         else:
+            outside_of_graphs.append((key, value))
+
+    ids_are_unique(outside_of_graphs)
+
+
+def ids_are_unique(content):
+    ids = set()
+    for _id in iter_ids(content):
+        if _id in ids:
             raise DuplicateIdsError(message="duplicate id: {}".format(_id))
 
+        ids.add(_id)
+
 
 def get_ids(_object):
-    ids = []
-    _subobjects = []
-    if type(_object) == list:
-        _subobjects = _object
-    if type(_object) == tuple:
-        key, value = _object
+    """
+    >>> get_ids([('node', [('id', 1), ('graphics', [('id', 2)])]), ('id', 3)])
+    [1, 2, 3]
+    """
+    return list(iter_ids(_object))
+
 
-        if key == 'id':
-            ids.append(value)
+def iter_ids(_object):
+    """yields the value of every `id` attribute in `_object`, in order"""
+    stack = [_object]
+    while stack:
+        _object = stack.pop()
 
-        if type(value) == list:
-            _subobjects = value
+        if type(_object) == list:
+            stack.extend(reversed(_object))
+        elif type(_object) == tuple:
+            key, value = _object
 
-    for _subobject in _subobjects:
-        ids += get_ids(_subobject)
+            if key == 'id':
+                yield value
 
-    return ids
+            if type(value) == list:
+                stack.append(value)
 
 
 def edge_is_valid(edge):
@@ -761,6 +1093,400 @@ def edge_is_valid(edge):
     return has_source and has_target
 
 
+################################################################################
+#
+#
+#
+#
+#
+#
+#                                   Tokenizing
+#
+#
+#
+#
+#
+#
+################################################################################
+# order is important here: numbers are only numbers if they end at whitespace
+# or a bracket (`1abc` is a word), and anything a word can't start with that
+# isn't matched by an earlier alternative is a parse error
+TOKEN_PATTERN = re.compile(r"""
+    \s*
+    (?:
+        (?P<comment>\#[^\n]*)
+        | "(?P<string>[^"]*)"
+        | (?P<open>\[)
+        | (?P<close>\])
+        | (?P<number>[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)(?=[\s\[\]]|$)
+        | (?P<word>[^\s\[\]"\#]+)
+    )
+""", re.VERBOSE)
+
+WHITESPACE_PATTERN = re.compile(r'\s*')
+
+# the same, for bytes-like buffers
+BYTES_TOKEN_PATTERN = re.compile(TOKEN_PATTERN.pattern.encode(), re.VERBOSE)
+BYTES_WHITESPACE_PATTERN = re.compile(rb'\s*')
+
+
+# brackets, skipping strings and comments
+BRACKET_PATTERN = re.compile(rb'"[^"]*"|\#[^\n]*|(?P<open>\[)|(?P<close>\])')
+
+# the key before a list's `[`
+LIST_KEY_PATTERN = re.compile(rb'([^\s\[\]"\#]+)\s*\Z')
+
+
+def find_graph_spans(buffer):
+    """see `get_graph_spans`. malformed gml is left for the parser to find"""
+    spans = []
+    depth = 0
+    start = None
+    top_level_end = 0
+
+    for match in BRACKET_PATTERN.finditer(buffer):
+        if match.lastgroup == 'open':
+            if depth == 0:
+                key = LIST_KEY_PATTERN.search(buffer, top_level_end,
+                                              match.start())
+
+                if key and key.group(1) == b'graph':
+                    start = key.start()
+                else:
+                    start = None
+
+            depth += 1
+        elif match.lastgroup == 'close':
+            depth -= 1
+
+            if depth == 0:
+                top_level_end = match.end()
+
+                if start is not None:
+                    spans.append((start, top_level_end))
+
+    return spans
+
+
+def is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+
+@contextlib.contextmanager
+def open_tokens(source, chunk_size=CHUNK_SIZE, memory_map=False):
+    """provides the tokens of `source`, which is either the path of a file or a
+    bytes-like buffer. a file is read `chunk_size` characters at a time, or,
+    if `memory_map` is True, memory mapped and tokenized as a buffer."""
+    if not is_path(source):
+        yield read_buffer_tokens(source)
+    elif memory_map:
+        with open(source, 'rb') as f:
+            # empty files can't be mapped
+            if not os.fstat(f.fileno()).st_size:
+                yield read_buffer_tokens(b'')
+                return
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                tokens = read_buffer_tokens(buffer)
+
+                # the map can't be closed while the tokenizer is matching it
+                try:
+                    yield tokens
+                finally:
+                    tokens.close()
+    else:
+        with open(source, 'r') as f:
+            yield read_tokens(f, chunk_size)
+
+
+def tokenize(text):
+    """yields (kind, value) tuples, where kind is one of 'comment', 'string',
+    'open', 'close', 'number', or 'word'.
+
+    numbers are typecast: they're ints unless they have a decimal point or an
+    exponent.
+
+    >>> list(tokenize('node [ id -1 label "a b" ] # done'))
+    [('word', 'node'), ('open', '['), ('word', 'id'), ('number', -1), ('word', 'label'), ('string', 'a b'), ('close', ']'), ('comment', '# done')]
+    >>> list(tokenize('x 1.5e3 y 2.'))
+    [('word', 'x'), ('number', 1500.0), ('word', 'y'), ('number', 2.0)]
+    >>> list(tokenize('label "unterminated'))
+    Traceback (most recent call last):
+    ...
+    pygmlion.GMLParseError: can't read gml at character 6: '"unterminated'
+    """
+    return read_tokens(io.StringIO(text))
+
+
+def read_tokens(f, chunk_size=CHUNK_SIZE):
+    """tokenizes the file object `f` (see `tokenize`), reading `chunk_size`
+    characters at a time.
+
+    a token that runs up to the end of a chunk might continue in the next one,
+    so it is held back until the next chunk is read. memory use only depends
+    on the chunk size and the longest token.
+
+    >>> list(read_tokens(io.StringIO('graph [ label "a long label" ]'), 4))
+    [('word', 'graph'), ('open', '['), ('word', 'label'), ('string', 'a long label'), ('close', ']')]
+    """
+    buffer = ''
+
+    # the number of characters read before `buffer`
+    offset = 0
+
+    while True:
+        chunk = f.read(chunk_size)
+        buffer += chunk
+
+        position = 0
+        for match in match_tokens(buffer, final=not chunk):
+            position = match.end()
+            yield read_token(match)
+
+        if not chunk:
+            break
+
+        buffer = buffer[position:]
+        offset += position
+
+    position = WHITESPACE_PATTERN.match(buffer, position).end()
+
+    if position != len(buffer):
+        raise GMLParseError(
+            "can't read gml at character {}: {!r}".format(
+                offset + position, buffer[position:position + 20].strip()
+            )
+        )
+
+
+def match_tokens(text, final=True):
+    """yields matches of consecutive tokens from the start of `text`, stopping
+    at the first thing that isn't a token.
+
+    if `final` is False, stops before a token that touches the end of `text`
+    """
+    if isinstance(text, str):
+        pattern = TOKEN_PATTERN
+    else:
+        pattern = BYTES_TOKEN_PATTERN
+
+    position = 0
+    for match in pattern.finditer(text):
+        if match.start() != position:
+            break
+
+        if not final and match.end() == len(text):
+            break
+
+        position = match.end()
+        yield match
+
+
+def read_buffer_tokens(buffer, encoding='utf-8'):
+    """tokenizes a bytes-like buffer (`bytes`, `bytearray`, `memoryview`, or an
+    `mmap.mmap`), see `tokenize`.
+
+    the buffer is matched in place: only the keys and values that are emitted
+    are decoded, and each distinct key is only decoded once.
+
+    >>> list(read_buffer_tokens(b'node [ id 1 label "caf\\xc3\\xa9" ]'))
+    [('word', 'node'), ('open', '['), ('word', 'id'), ('number', 1), ('word', 'label'), ('string', 'café'), ('close', ']')]
+    """
+    words = {}
+
+    position = 0
+    for match in match_tokens(buffer):
+        position = match.end()
+        kind = match.lastgroup
+
+        if kind == 'word':
+            value = match.group(kind)
+
+            # keys repeat a lot; share one string for each
+            if value not in words:
+                words[value] = value.decode(encoding)
+
+            yield kind, words[value]
+        else:
+            yield read_token(match, encoding)
+
+    position = BYTES_WHITESPACE_PATTERN.match(buffer, position).end()
+
+    if position != len(buffer):
+        raise GMLParseError(
+            "can't read gml at byte {}: {!r}".format(
+                position,
+                bytes(buffer[position:position + 20]).strip().decode(
+                    encoding, 'replace'),
+            )
+        )
+
+
+def read_token(match, encoding=None):
+    """returns a token match's (kind, value). `encoding` decodes matches of
+    `BYTES_TOKEN_PATTERN`"""
+    kind = match.lastgroup
+    value = match.group(kind)
+
+    if kind == 'number':
+        # numbers are ints unless they have a decimal point or an exponent.
+        # (int and float read bytes as well as strings)
+        try:
+            value = int(value)
+        except ValueError:
+            value = float(value)
+    else:
+        if encoding:
+            value = value.decode(encoding)
+
+        if kind == 'comment':
+            value = value.rstrip()
+
+    return kind, value
+
+
+def parse_tokens(tokens, closing=False):
+    """builds the (key, value) tuple list of `get_raw_gml` from `tokenize`'s
+    tokens. uses a stack instead of recursion, so nesting depth doesn't matter.
+
+    if `closing` is True, `tokens` should be an iterator that has just read a
+    list's `[`: the list's contents are returned, and `tokens` is left just
+    after its `]`.
+
+    >>> parse_tokens(tokenize('graph [ node [ id 1 ] ] Creator "me"'))
+    [('graph', [('node', [('id', 1)])]), ('Creator', 'me')]
+    >>> parse_tokens(tokenize('graph [ node [ id 1 ]'))
+    Traceback (most recent call last):
+    ...
+    pygmlion.ListParseError: unclosed list: graph
+    """
+    content = []
+    current = content
+    stack = []
+    key = None
+
+    for kind, value in tokens:
+        if kind == 'comment':
+            current.append(('comment', value))
+        elif key is None:
+            if kind == 'word':
+                key = value
+            elif kind == 'close' and stack:
+                current = stack.pop()
+            elif kind == 'close' and closing:
+                return content
+            else:
+                raise GMLParseError("expected a key, found: {!r}".format(value))
+        else:
+            if kind == 'open':
+                sublist = []
+                current.append((key, sublist))
+                stack.append(current)
+                current = sublist
+            elif kind in ('number', 'string', 'word'):
+                current.append((key, value))
+            else:
+                raise GMLParseError(
+                    "expected a value for {}, found: {!r}".format(key, value)
+                )
+
+            key = None
+
+    if key is not None:
+        raise GMLParseError("missing value for: {}".format(key))
+
+    if stack:
+        raise ListParseError("unclosed list: {}".format(stack[-1][-1][0]))
+
+    if closing:
+        raise ListParseError("unclosed list")
+
+    return content
+
+
+def iter_items(tokens, closing=False):
+    """yields (key, kind, value) for each attribute at one level of nesting,
+    skipping comments. `kind` and `value` are those of the attribute's value
+    token; when `kind` is 'open', the caller has to read the list (see
+    `read_value`) before asking for the next item.
+
+    `closing` is as in `parse_tokens`.
+    """
+    key = None
+
+    for kind, value in tokens:
+        if kind == 'comment':
+            continue
+        elif key is None:
+            if kind == 'word':
+                key = value
+            elif kind == 'close' and closing:
+                return
+            else:
+                raise GMLParseError("expected a key, found: {!r}".format(value))
+        elif kind in ('open', 'number', 'string', 'word'):
+            yield key, kind, value
+            key = None
+        else:
+            raise GMLParseError(
+                "expected a value for {}, found: {!r}".format(key, value)
+            )
+
+    if key is not None:
+        raise GMLParseError("missing value for: {}".format(key))
+
+    if closing:
+        raise ListParseError("unclosed list")
+
+
+def read_value(tokens, kind, value):
+    """returns an item's value from `iter_items`, formatted as by `get_gml`"""
+    if kind == 'open':
+        return format_gml_dict(parse_tokens(tokens, closing=True))
+
+    return value
+
+
+def iter_graph(tokens, validate=True):
+    """yields the events of `iter_gml` for a single graph. `tokens` should have
+    just read the graph's `[`."""
+    header = {}
+    started = False
+    ids = set()
+
+    for key, kind, value in iter_items(tokens, closing=True):
+        value = read_value(tokens, kind, value)
+
+        if key in ('node', 'edge') and kind == 'open':
+            if not started:
+                yield 'graph', header
+                started = True
+
+            if validate:
+                if key == 'edge' and not ('source' in value and
+                                          'target' in value):
+                    raise EdgeError
+
+                _id = value.get('id')
+                if _id is not None:
+                    if _id in ids:
+                        raise DuplicateIdsError(
+                            message="duplicate id: {}".format(_id))
+
+                    ids.add(_id)
+
+            yield key, value
+        elif started:
+            yield 'attribute', (key, value)
+        elif kind == 'open':
+            header.setdefault(key, []).append(value)
+        else:
+            header[key] = value
+
+    if not started:
+        yield 'graph', header
+
+
 ################################################################################
 #
 #
@@ -781,6 +1507,11 @@ class ListParseError(Exception):
     pass
 
 
+class GMLParseError(Exception):
+    """raised when the gml has something that isn't a key, value, or list"""
+    pass
+
+
 class BooleanParseError(Exception):
     """raised when a boolean is poorly formatted"""
     pass
@@ -8,19 +8,55 @@
 # http://github.com/dblarremore/webweb Comments and suggestions always welcome.
 
 
+from collections import Counter
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+import base64
 import copy
+import itertools
 import json
+import math
+import os
+import shutil
 import webbrowser
 import tempfile
 import numpy as np
 from pathlib import Path
+from urllib.parse import quote
 import uuid
 import sys
 
 sys.path.append(str(Path(__file__).parent))
 
+import forcelayout
 import pygmlion
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JSONEncoder(json.JSONEncoder):
+    """a `json.JSONEncoder` that encodes numpy scalars and arrays and
+    `EdgeList`s natively, without first copying the data."""
+
+    @staticmethod
+    def default_for(o):
+        if isinstance(o, EdgeList):
+            return o.tolist()
+        elif isinstance(o, np.ndarray):
+            return o.tolist()
+        elif isinstance(o, np.generic):
+            return o.item()
+
+        raise TypeError(
+            "Object of type {} is not JSON serializable".format(
+                type(o).__name__))
+
+    def default(self, o):
+        return self.default_for(o)
+
 
 class Web(dict):
     """a webweb object.
@@ -37,13 +73,20 @@ class Web(dict):
             metadata=None,
             nx_G=None,
             gml_file=None,
+            copy=True,
+            gml_workers=1,
+            ig_G=None,
+            gt_G=None,
     ):
         """
         usage:
         - `web = Web(adjacency=[[0, 1]], title='a web woohoo')`
 
         parameters:
-        - `adjacency`: edge list or adjacency matrix
+        - `adjacency`: edge list or adjacency matrix (a list, numpy array or
+          scipy.sparse matrix). Matrices and numpy edge lists are stored as
+          columnar `EdgeList`s. Can also be a pandas DataFrame or pyarrow
+          Table with `source`, `target` and (optionally) `weight` columns
         - `title`: string. Will set the html title of the visualization if
           `display.attachWebwebToElementWithId = None`
         - `display`: dictionary of display parameters
@@ -77,7 +120,16 @@ class Web(dict):
         }
         ```
         - `nx_G`: a networkx graph.
-        - `gml_file`: path to a gml file
+        - `gml_file`: path to a gml file. each graph in it becomes a layer
+        - `copy`: boolean. default is True. If False, the layer takes ownership
+          of `adjacency`, `nodes` and `metadata` instead of deep copying them,
+          so they shouldn't be modified afterwards
+        - `gml_workers`: int. default is 1. If more than 1, the graphs of
+          `gml_file` are read in a pool of that many processes. None uses a
+          process per cpu
+        - `ig_G`: an igraph graph.
+        - `gt_G`: a graph-tool graph. (untested against graph-tool itself;
+          see `Network.get_columnar_layer_from_graph_tool_graph`)
 
         ---
 
@@ -93,14 +145,19 @@ class Web(dict):
         self.networks = Networks()
 
         # if we have an adjacency, add it into the networks object
-        if len(adjacency) or nx_G or gml_file:
+        if (Network.get_adjacency_size(adjacency) or nx_G or gml_file or
+                ig_G is not None or gt_G is not None):
             getattr(self.networks, self.title)(
                 adjacency=adjacency,
                 adjacency_type=adjacency_type,
                 nodes=nodes,
                 metadata=metadata,
                 nx_G=nx_G,
+                ig_G=ig_G,
+                gt_G=gt_G,
                 gml_file=gml_file,
+                gml_workers=gml_workers,
+                copy=copy,
             )
 
     @staticmethod
@@ -137,9 +194,39 @@ class Web(dict):
     def client_file_path(cls, dir_name, file_name):
         return cls.client_path().joinpath(dir_name, file_name)
 
+    # the client assets, keyed by the name they're formatted into the html as
+    client_files = {
+        'd3js': ('js', 'd3.v5.min.js'),
+        'style': ('css', 'style.css'),
+        'colorsjs': ('js', 'colors.js'),
+        'blobjs': ('js', 'Blob.js'),
+        'filesaverjs': ('js', 'FileSaver.min.js'),
+        'webwebjs': ('js', 'webweb.v5.js'),
+    }
+
+    # process-level caches of client file contents and of the formatted html
+    # shell, keyed on file paths and modification times
+    client_file_cache = {}
+    html_shell_cache = {}
+
     @classmethod
     def get_client_file_content(cls, dir_name, file_name):
-        return cls.client_file_path(dir_name, file_name).read_text()
+        path = cls.client_file_path(dir_name, file_name)
+        mtime = path.stat().st_mtime_ns
+
+        cached = cls.client_file_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        content = path.read_text()
+        cls.client_file_cache[path] = (mtime, content)
+        return content
+
+    @classmethod
+    def clear_client_file_cache(cls):
+        """forgets cached client files, so they are reread on next use"""
+        cls.client_file_cache.clear()
+        cls.html_shell_cache.clear()
 
     @staticmethod
     def html_path(unique=True):
@@ -148,39 +235,501 @@ class Web(dict):
 
         return Path(tempfile.gettempdir()).joinpath(filename)
 
-    def show(self):
+    def show(self, layout=False, **encoding):
         """display the webweb visualization.
         - creates the html file
         - opens the web browser
+
+        parameters:
+        - layout: see `save`
+        - encoding: how to encode the network data; see `iter_json`
         """
+        if layout:
+            self.compute_layout(cache=layout)
+
         path = self.html_path()
-        path.write_text(self.html)
+
+        with open(path, 'w') as f:
+            self.write_html(f, **encoding)
+
         webbrowser.open_new("file://" + str(path))
 
-    def save(self, path):
+    def save(self, path, asset_path=None, data_path=None, layout=False,
+             **encoding):
         """saves the webweb visualization to the specified path
 
         parameters:
         - path: the path to save to.
+        - asset_path: path to a directory. default is None. If None, the
+          client's javascript and css are embedded in the html. Otherwise, a
+          single shared copy of them is kept in `asset_path` and the html links
+          to it. Pass `Web.client_path()` to link to the installed client.
+        - data_path: path to a file. default is None. If None, the network data
+          is embedded in the html. Otherwise, it is written to `data_path` and
+          the html loads it from there:
+            - a `.js` file is loaded with a script tag (this works when the
+              html is opened straight from disk)
+            - any other file holds plain json, which the client fetches once
+              the page has loaded. Browsers only allow this when the html is
+              served over http.
+        - layout: default is False. If True, node positions are computed in
+          python (see `compute_layout`) and kept in the default layout cache,
+          so saving the same graphs again reuses them. Can also be a
+          `forcelayout.LayoutCache` to keep them in
+        - encoding: how to encode the network data; see `iter_json`
         """
+        if layout:
+            self.compute_layout(cache=layout)
+
+        html_directory = Path(path).resolve().parent
+
+        asset_urls = None
+        if asset_path is not None:
+            asset_urls = self.get_client_file_urls(asset_path, html_directory)
+
+        data_url = None
+        if data_path is not None:
+            self.save_data(data_path, **encoding)
+            data_url = self.get_relative_url(data_path, html_directory)
+
         with open(path, 'w') as f:
-            f.write(self.html)
+            self.write_html(f, asset_urls, data_url, **encoding)
+
+    def save_data(self, path, **encoding):
+        """writes the network data to `path`, as javascript that defines
+        `wwdata` if `path` ends in `.js`, and as json otherwise."""
+        is_javascript = Path(path).suffix == '.js'
+
+        with open(path, 'w') as f:
+            if is_javascript:
+                f.write('var wwdata = ')
+
+            self.write_json(f, **encoding)
+
+            if is_javascript:
+                f.write(';\n')
+
+    def to_gml(self, path):
+        """writes every layer of every network to `path` as gml, one graph per
+        layer. each graph is labeled with its network's name.
+
+        see `Network.to_gml`"""
+        pygmlion.write_gml(itertools.chain.from_iterable(
+            network.iter_gml_graphs(label=name)
+            for name, network in vars(self.networks).items()
+        ), path)
+
+    def compute_layout(self, cache=None, warm_start=False, **parameters):
+        """computes the positions of the nodes in every layer of every
+        network, with the display's layout parameters, so the client doesn't
+        have to.
+
+        see `Network.compute_layout`"""
+        cache = forcelayout.get_layout_cache(cache)
+
+        for network in vars(self.networks).values():
+            network.compute_layout(
+                vars(self.display), cache, warm_start, **parameters)
+
+    def warm_layout_cache(self, cache=True, warm_start=False, **parameters):
+        """lays out every layer of every network into the layout cache,
+        without changing the web. Laying it out later (with `compute_layout`
+        or `save(..., layout=True)`) then reads the positions from the cache.
+
+        parameters:
+        - `cache`: see `Network.compute_layout`. default is True
+        - `warm_start`: see `Network.compute_layout`. It must match the later
+          layout's for the cached positions to be found
+        - `parameters`: passed to `forcelayout.get_layout`
+        """
+        cache = forcelayout.get_layout_cache(cache)
+
+        for network in vars(self.networks).values():
+            for _ in network.iter_layer_layouts(
+                    vars(self.display), cache, warm_start, **parameters):
+                pass
+
+    @staticmethod
+    def clear_layout_cache():
+        """deletes every layout in the default layout cache"""
+        forcelayout.LayoutCache().clear()
+
+    @staticmethod
+    def get_relative_url(path, directory):
+        return quote(Path(os.path.relpath(
+            Path(path).resolve(), directory)).as_posix())
 
     @property
     def json(self):
-        data = {
-            "display": vars(self.display),
-            'networks': {name: vars(data) for name, data in
-                         vars(self.networks).items()},
-            "title": self.title,
-        }
+        return "".join(self.iter_json())
+
+    def write_json(self, f, fast=True, **encoding):
+        """streams the json representation of the web to a file-like object
+
+        parameters:
+        - f: a file-like object with a `write` method
+        - fast: boolean. default is True. If True, will encode with `orjson`
+          when it is installed. The output is then more compact than (but
+          otherwise equivalent to) `Web.json`, except that NaN and infinities
+          are written as null whether or not `orjson` is installed
+        - encoding: how to encode the network data; see `iter_json`
+        """
+        for chunk in self.iter_json(fast=fast, **encoding):
+            f.write(chunk)
+
+    def iter_json(self, chunk_size=10000, fast=False, binary_edges=False,
+                  delta_layers=False, intern_nodes=False):
+        """yields the json representation of the web in pieces.
+
+        networks, layers and edges are encoded one at a time (edges
+        `chunk_size` at a time), so the full payload is never held in memory
+        as a single dict or string. The pieces join to what `json.dumps` would
+        have produced.
+
+        parameters:
+        - chunk_size: int. the number of edges to encode at a time
+        - fast: boolean. default is False. See `encode_json`
+        - binary_edges: boolean. default is False. If True, edge lists whose
+          nodes are integers are sent as base64 encoded little-endian typed
+          arrays (int32 `source` and `target`, float32 `weight`) instead of as
+          lists of lists, which the client reads without parsing every edge.
+        - delta_layers: boolean. default is False. If True, each layer after
+          a network's first is sent as the edges, nodes and metadata that were
+          added, changed or removed since the layer before it (see
+          `Network.get_layer_delta`). The client rebuilds a layer like this
+          when it's first shown.
+        - intern_nodes: boolean. default is False. If True, each distinct node
+          (a name and its attributes) is sent once, in a `nodeTable`, and
+          layers list the indexes of their nodes in it instead of holding a
+          `nodes` dict (see `get_node_tables`)
+        """
+        display = vars(self.display)
+
+        # layers sent as deltas don't reference the node tables, so when both
+        # are on, the deltas are worked out first
+        deltas = {}
+        if delta_layers and intern_nodes:
+            deltas = {
+                name: self.get_network_deltas(network)
+                for name, network in vars(self.networks).items()
+            }
+
+        web_table, network_tables, layer_indexes = [], {}, {}
+        if intern_nodes:
+            web_table, network_tables, layer_indexes = self.get_node_tables(
+                deltas)
+
+            if web_table:
+                display = dict(display, nodeTable=web_table)
+
+        yield '{"display": '
+        yield self.encode_json(display, fast)
+        yield ', "networks": {'
+
+        for i, (name, network) in enumerate(vars(self.networks).items()):
+            if i:
+                yield ', '
+
+            yield self.encode_json(name) + ': '
+            yield from self.iter_network_json(
+                network, chunk_size, fast, binary_edges, delta_layers,
+                network_tables.get(name), layer_indexes.get(name),
+                deltas.get(name))
+
+        yield '}, "title": '
+        yield self.encode_json(self.title)
+        yield '}'
+
+    def iter_network_json(self, network, chunk_size, fast=False,
+                          binary_edges=False, delta_layers=False,
+                          network_table=None, node_indexes=None,
+                          deltas=None):
+        yield '{'
+        for i, (key, value) in enumerate(vars(network).items()):
+            if i:
+                yield ', '
+
+            yield self.encode_json(key) + ': '
+
+            if key == 'layers':
+                yield '['
+                for j, layer in enumerate(value):
+                    if j:
+                        yield ', '
+
+                    delta_layer = None
+                    if deltas is not None:
+                        delta_layer = deltas.get(j)
+                    elif delta_layers and j:
+                        delta_layer = network.get_layer_delta(
+                            value[j - 1], layer, vars(self.display))
+
+                    layer = delta_layer or layer
+
+                    if node_indexes and j in node_indexes:
+                        layer = {
+                            ('nodeIndexes' if key == 'nodes' else key):
+                            (node_indexes[j] if key == 'nodes' else value)
+                            for key, value in layer.items()
+                        }
+
+                    yield from self.iter_layer_json(
+                        layer, chunk_size, fast, binary_edges)
+                yield ']'
+            else:
+                yield self.encode_json(value, fast)
+
+        if network_table:
+            yield ', "nodeTable": '
+            yield self.encode_json(network_table, fast)
+        yield '}'
+
+    def get_network_deltas(self, network):
+        """returns a dict of layer index to the delta that layer is sent as
+        (see `Network.get_layer_delta`), for those layers that are"""
+        deltas = {}
+        for j in range(1, len(network.layers)):
+            delta_layer = network.get_layer_delta(
+                network.layers[j - 1], network.layers[j], vars(self.display))
+
+            if delta_layer:
+                deltas[j] = delta_layer
+
+        return deltas
+
+    def get_node_tables(self, deltas={}):
+        """interns the nodes of every layer of every network. a node is its
+        name and attributes; nodes that would be encoded the same way are
+        the same entry.
+
+        layers in `deltas` (a dict of network name to the output of
+        `get_network_deltas`) are sent as deltas, so their nodes are skipped.
+
+        returns (web_table, network_tables, layer_indexes):
+        - `web_table`: list of [name, attributes] entries found in more than
+          one network. it's sent in the display
+        - `network_tables`: dict of network name to the list of entries only
+          that network has
+        - `layer_indexes`: dict of network name to a dict of layer index to
+          the indexes of the layer's nodes. The `web_table`'s entries are
+          numbered first, then the network's
+        """
+        entries = {}
+        entry_networks = {}
+        layer_keys = {}
+
+        # layers added with `copy=False` can share attribute dicts, so each
+        # is only encoded once
+        encoded_attributes = {}
+
+        for network_name, network in vars(self.networks).items():
+            network_deltas = deltas.get(network_name, {})
+
+            for j, layer in enumerate(network.layers):
+                nodes = layer.get('nodes')
+
+                if not nodes or not isinstance(nodes, dict):
+                    continue
+
+                if j in network_deltas:
+                    continue
+
+                keys = layer_keys.setdefault(network_name, {})[j] = []
+                for name, attributes in nodes.items():
+                    encoded = encoded_attributes.get(id(attributes))
+
+                    if encoded is None:
+                        encoded = self.encode_json(attributes)
+                        encoded_attributes[id(attributes)] = encoded
+
+                    key = (type(name), name, encoded)
+                    entries.setdefault(key, [name, attributes])
+                    entry_networks.setdefault(key, set()).add(network_name)
+                    keys.append(key)
+
+        # a network with one layer to intern, none of whose nodes are in other
+        # networks, is smaller sent as it is
+        for network_name, layers in list(layer_keys.items()):
+            if len(layers) == 1 and all(
+                    len(entry_networks[key]) == 1
+                    for keys in layers.values() for key in keys):
+                del layer_keys[network_name]
+
+        web_index = {}
+        for key, networks in entry_networks.items():
+            if len(networks) > 1:
+                web_index[key] = len(web_index)
+
+        web_table = [entries[key] for key in web_index]
+        network_tables, layer_indexes = {}, {}
+
+        for network_name, layers in layer_keys.items():
+            index = dict(web_index)
+            table = network_tables[network_name] = []
+
+            for j, keys in layers.items():
+                for key in keys:
+                    if key not in index:
+                        index[key] = len(index)
+                        table.append(entries[key])
+
+                layer_indexes.setdefault(network_name, {})[j] = [
+                    index[key] for key in keys]
+
+        return web_table, network_tables, layer_indexes
+
+    def iter_layer_json(self, layer, chunk_size, fast=False,
+                        binary_edges=False):
+        yield '{'
+        for i, (key, value) in enumerate(layer.items()):
+            if i:
+                yield ', '
+
+            yield self.encode_json(key) + ': '
+
+            typed_columns = None
+            if key == 'edgeList' and binary_edges:
+                typed_columns = self.get_typed_edge_columns(value)
+
+            if typed_columns:
+                yield from self.iter_typed_edge_list_json(
+                    typed_columns, chunk_size)
+            elif key == 'edgeList' and isinstance(value, (list, tuple, EdgeList)):
+                yield from self.iter_edge_list_json(value, chunk_size, fast)
+            else:
+                yield self.encode_json(value, fast)
+        yield '}'
+
+    def iter_edge_list_json(self, edges, chunk_size, fast=False):
+        yield '['
+        for start in range(0, len(edges), chunk_size):
+            if start:
+                yield ', '
+
+            chunk = edges[start:start + chunk_size]
+
+            if isinstance(chunk, EdgeList):
+                chunk = chunk.tolist()
+
+            # drop the brackets around each chunk
+            yield self.encode_json(chunk, fast)[1:-1]
+        yield ']'
+
+    @staticmethod
+    def get_typed_edge_columns(edges):
+        """returns a layer's edges as int32 `source` and `target` and float32
+        `weight` arrays, or None if they can't be represented that way (eg,
+        if nodes are named with strings)"""
+        if not isinstance(edges, EdgeList):
+            try:
+                edges = np.asarray(edges)
+            except ValueError:
+                # edges of different lengths
+                return None
+
+            if edges.ndim != 2 or edges.shape[1] not in [2, 3]:
+                return None
+
+            edges = EdgeList.from_array(edges)
+
+        columns = {}
+        for name in ['source', 'target']:
+            column = getattr(edges, name)
+
+            if column.dtype.kind not in 'iuf':
+                return None
+
+            typed = column.astype('<i4')
+            if not np.array_equal(typed, column):
+                return None
+
+            columns[name] = typed
+
+        if edges.weight is not None:
+            if edges.weight.dtype.kind not in 'biuf':
+                return None
+
+            columns['weight'] = edges.weight.astype('<f4')
+
+        return columns
+
+    @staticmethod
+    def iter_typed_edge_list_json(columns, chunk_size):
+        # base64 encoded pieces only join up if they hold multiples of 3 bytes
+        chunk_size = max(3, chunk_size - chunk_size % 3)
+
+        yield '{'
+        for i, (name, column) in enumerate(columns.items()):
+            if i:
+                yield ', '
 
-        return json.dumps(self.safe_serialize(data))
+            yield '"{}": "'.format(name)
+            for start in range(0, len(column), chunk_size):
+                chunk = column[start:start + chunk_size]
+                yield base64.b64encode(chunk.tobytes()).decode('ascii')
+            yield '"'
+        yield '}'
+
+    json_encoder = JSONEncoder()
+
+    # raises on NaN and infinities, which `fast` encoding writes as null
+    strict_json_encoder = JSONEncoder(allow_nan=False)
+
+    def encode_json(self, data, fast=False):
+        """encodes data as json, handling numpy types and `EdgeList`s.
+
+        parameters:
+        - data: the data to encode
+        - fast: boolean. default is False. If True, will use `orjson` when it
+          is installed. NaN and infinities are written as null (as `orjson`
+          writes them), whether or not it is. Otherwise, output matches
+          `json.dumps`
+        """
+        if fast and orjson:
+            try:
+                return orjson.dumps(
+                    data,
+                    default=JSONEncoder.default_for,
+                    option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+                ).decode()
+            except TypeError:
+                pass
+
+        if not fast:
+            return self.encode_json_with(self.json_encoder, data)
+
+        try:
+            return self.encode_json_with(self.strict_json_encoder, data)
+        except ValueError:
+            return self.strict_json_encoder.encode(
+                self.replace_non_finite(self.safe_serialize(data)))
+
+    def encode_json_with(self, encoder, data):
+        try:
+            return encoder.encode(data)
+        except TypeError:
+            # json only takes python scalars as keys; numpy keys have to be
+            # converted by walking the data
+            return encoder.encode(self.safe_serialize(data))
+
+    def replace_non_finite(self, data):
+        """replaces NaN and infinite floats with None"""
+        if isinstance(data, float):
+            return data if math.isfinite(data) else None
+        elif isinstance(data, (list, tuple)):
+            return [self.replace_non_finite(x) for x in data]
+        elif isinstance(data, dict):
+            return {key: self.replace_non_finite(value) for
+                    key, value in data.items()}
+
+        return data
 
     def safe_serialize(self, data):
         """try to handle numpy datatypes gracefully"""
         if type(data) == list:
             return [self.safe_serialize(x) for x in data]
+        elif isinstance(data, (EdgeList, np.ndarray)):
+            return data.tolist()
         elif type(data) == dict:
             return {self.safe_serialize(key): self.safe_serialize(val) for
                     key, val in data.items()}
@@ -195,7 +744,64 @@ class Web(dict):
 
     @property
     def html(self):
-        return """
+        head, tail = self.html_shell()
+        return head + '<script type="text/javascript">var wwdata = ' + \
+            self.json + ';</script>' + tail
+
+    def write_html(self, f, asset_urls=None, data_url=None, **encoding):
+        """streams the webweb visualization's html to a file-like object
+
+        parameters:
+        - f: a file-like object with a `write` method
+        - asset_urls: dict of client file urls (see `get_client_file_urls`).
+          default is None. If None, the client files are embedded.
+        - data_url: string. url of the network data (see `save_data`). default
+          is None. If None, the network data is embedded.
+        - encoding: how to encode the network data; see `iter_json`
+        """
+        if asset_urls:
+            head, tail = self.format_linked_html_shell(asset_urls)
+        else:
+            head, tail = self.html_shell()
+
+        f.write(head)
+
+        if data_url is None:
+            f.write('<script type="text/javascript">var wwdata = ')
+            self.write_json(f, **encoding)
+            f.write(';</script>')
+        elif data_url.endswith('.js'):
+            f.write('<script type="text/javascript" src="{}"></script>'.format(
+                data_url))
+        else:
+            f.write('<script type="text/javascript">var wwdataURL = {};'
+                    '</script>'.format(json.dumps(data_url)))
+
+        f.write(tail)
+
+    @classmethod
+    def html_shell(cls):
+        """returns the html that goes before and after the network data.
+
+        the shell is the same for every web, so it is only formatted again
+        when a client file has changed
+        """
+        key = tuple(
+            (path, path.stat().st_mtime_ns) for path in [
+                cls.client_file_path(dir_name, file_name) for
+                dir_name, file_name in cls.client_files.values()
+            ]
+        )
+
+        if key not in cls.html_shell_cache:
+            cls.html_shell_cache.clear()
+            cls.html_shell_cache[key] = cls.format_html_shell()
+
+        return cls.html_shell_cache[key]
+
+    @classmethod
+    def format_html_shell(cls):
+        head, tail = """
             <html>
                 <head>
                     <script>{d3js}</script>
@@ -206,20 +812,74 @@ class Web(dict):
                     <script type="text/javascript">{colorsjs}</script>
                     <script type="text/javascript">{blobjs}</script>
                     <script type="text/javascript">{filesaverjs}</script>
-                    <script type="text/javascript">var wwdata = {json};</script>
+                    {data}
                     <script type="text/javascript">{webwebjs}</script>
                 </body>
             </html>
-        """.format(
-            title=self.title,
-            d3js=self.get_client_file_content('js', 'd3.v5.min.js'),
-            style=self.get_client_file_content('css', 'style.css'),
-            colorsjs=self.get_client_file_content('js', 'colors.js'),
-            blobjs=self.get_client_file_content('js', 'Blob.js'),
-            filesaverjs=self.get_client_file_content('js', 'FileSaver.min.js'),
-            json=self.json,
-            webwebjs=self.get_client_file_content('js', 'webweb.v5.js'),
-        )
+        """.split('{data}')
+
+        assets = {
+            name: cls.get_client_file_content(dir_name, file_name) for
+            name, (dir_name, file_name) in cls.client_files.items()
+        }
+
+        return head.format(**assets), tail.format(**assets)
+
+    @staticmethod
+    def format_linked_html_shell(asset_urls):
+        head, tail = """
+            <html>
+                <head>
+                    <script type="text/javascript" src="{d3js}"></script>
+                    <link rel="stylesheet" href="{style}">
+                    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+                </head>
+                <body>
+                    <script type="text/javascript" src="{colorsjs}"></script>
+                    <script type="text/javascript" src="{blobjs}"></script>
+                    <script type="text/javascript" src="{filesaverjs}"></script>
+                    {data}
+                    <script type="text/javascript" src="{webwebjs}"></script>
+                </body>
+            </html>
+        """.split('{data}')
+
+        return head.format(**asset_urls), tail.format(**asset_urls)
+
+    @classmethod
+    def get_client_file_urls(cls, asset_path, html_directory):
+        """makes sure `asset_path` holds a current copy of the client files and
+        returns their urls, relative to `html_directory`.
+
+        files are only copied when they're missing or out of date, so many
+        visualizations can share one copy.
+        """
+        asset_path = Path(asset_path).resolve()
+
+        urls = {}
+        for name, (dir_name, file_name) in cls.client_files.items():
+            source = cls.client_file_path(dir_name, file_name)
+            destination = asset_path.joinpath(dir_name, file_name)
+
+            if destination != source.resolve():
+                cls.copy_client_file(source, destination)
+
+            urls[name] = cls.get_relative_url(destination, html_directory)
+
+        return urls
+
+    @staticmethod
+    def copy_client_file(source, destination):
+        if destination.exists():
+            source_stat = source.stat()
+            destination_stat = destination.stat()
+
+            if (source_stat.st_size == destination_stat.st_size and
+                    source_stat.st_mtime_ns == destination_stat.st_mtime_ns):
+                return
+
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(str(source), str(destination))
 
 
 class Display(dict):
@@ -245,27 +905,37 @@ class Network(dict):
 
         if the object already had layers, those layers will be removed.
 
-        see `add_layer` for parameter information
+        see `add_layer` for parameter information. a `gml_file` adds a layer
+        for each graph in it; `gml_workers` is as in `Web`.
         """
         self.layers = []
 
         if len(kwargs.keys()):
             self.__call__(**kwargs)
 
-    @staticmethod
-    def get_gml_graphs(gml_file):
-        return pygmlion.get_gml(gml_file).pop('graph', [])
-
     def __call__(self, **kwargs):
         # treat calling the object as resetting it
         self.layers = []
 
         gml_file = kwargs.pop('gml_file', '')
+        gml_workers = kwargs.pop('gml_workers', 1)
         if gml_file:
-            for graph in self.get_gml_graphs(gml_file):
-                kwargs['adjacency'], kwargs[
-                    'nodes'] = self.read_graph_from_gml(graph)
-                self.add_layer(**kwargs)
+            # the graphs are read into new objects, so only the metadata passed
+            # in needs copying
+            should_copy = kwargs.pop('copy', True)
+            metadata = kwargs.pop('metadata', None)
+            kwargs.pop('adjacency', None)
+            kwargs.pop('nodes', None)
+
+            for adjacency, nodes in self.read_graphs_from_gml(gml_file,
+                                                              gml_workers):
+                self.add_layer(
+                    adjacency=adjacency,
+                    nodes=nodes,
+                    metadata=self.copy_layer_data(metadata, should_copy),
+                    copy=False,
+                    **kwargs
+                )
         elif len(kwargs.keys()):
             self.add_layer(**kwargs)
 
@@ -276,12 +946,20 @@ class Network(dict):
             nodes={},
             metadata=None,
             nx_G=None,
-            gml_file=None
+            gml_file=None,
+            copy=True,
+            ig_G=None,
+            gt_G=None,
+            node_table=None,
+            columns=None,
     ):
         """adds a layer to the network.
 
         parameters:
-        - `adjacency`: edge list or adjacency matrix
+        - `adjacency`: edge list or adjacency matrix (a list, numpy array or
+          scipy.sparse matrix). Matrices and numpy edge lists are stored as
+          columnar `EdgeList`s. Can also be a pandas DataFrame or pyarrow
+          Table of edges (see `columns`)
         - `adjacency_type`: string. 'matrix' or 'edge list'
         - `nodes`: dict of node attribute dicts
         ```json
@@ -313,6 +991,20 @@ class Network(dict):
         ```
         - `nx_G`: a networkx graph.
         - `gml_file`: path to a gml file
+        - `copy`: boolean. default is True. If False, the layer takes ownership
+          of `adjacency`, `nodes` and `metadata` instead of deep copying them,
+          so they shouldn't be modified afterwards
+        - `ig_G`: an igraph graph. its edges and vertex attributes are read as
+          columns; vertex attributes become vectorized `metadata`
+        - `gt_G`: a graph-tool graph, read like `ig_G`. vertex property maps
+          become vectorized `metadata`. (untested against graph-tool itself;
+          see `get_columnar_layer_from_graph_tool_graph`)
+        - `node_table`: a pandas DataFrame or pyarrow Table with a row per
+          node. its columns (other than the node column) become vectorized
+          `metadata`. without a node column, row `i` is node `i`
+        - `columns`: dict. the names of the table columns that hold each
+          edge's `source`, `target` and `weight`, and each node's `id`. the
+          defaults are those names. the weight column is optional
 
         ---
 
@@ -328,35 +1020,98 @@ class Network(dict):
         - nodes
         - metadata
         - nx_G
+        - ig_G
+        - gt_G
         - gml_file
         """
-        if len(adjacency) and isinstance(adjacency, np.ndarray):
-            adjacency = adjacency.tolist()
+        # anything we build here is already ours and doesn't need copying
+        copy_adjacency = copy_nodes = copy
+
+        # vectorized metadata read from a graph object
+        graph_metadata = None
 
         if nx_G:
-            adjacency, nodes = self.get_adjacency_and_nodes_from_networkx_graph(
-                nx_G)
-        elif gml_file:
-            graphs = self.get_gml_graphs(gml_file)
+            layer = self.get_columnar_layer_from_networkx_graph(nx_G)
 
-            if graphs:
-                adjacency, nodes = self.read_graph_from_gml(graphs[0])
-        elif adjacency:
+            if layer:
+                adjacency, nodes, graph_metadata = layer
+            else:
+                adjacency, nodes = (
+                    self.get_adjacency_and_nodes_from_networkx_graph(nx_G))
+
+            copy_adjacency = False
+        elif ig_G is not None:
+            adjacency, nodes, graph_metadata = (
+                self.get_columnar_layer_from_igraph_graph(ig_G))
+            copy_adjacency = False
+        elif gt_G is not None:
+            adjacency, nodes, graph_metadata = (
+                self.get_columnar_layer_from_graph_tool_graph(gt_G))
+            copy_adjacency = False
+        elif self.is_table(adjacency) or node_table is not None:
+            if not self.is_table(adjacency):
+                adjacency = self.get_edge_list_columns(adjacency,
+                                                       adjacency_type)
+
+            adjacency, graph_metadata = self.get_columnar_layer_from_tables(
+                adjacency, node_table, columns)
+            copy_adjacency = False
+        elif gml_file:
+            graphs = self.read_graphs_from_gml(gml_file)
+            graph = next(graphs, None)
+            graphs.close()
+
+            if graph:
+                adjacency, nodes = graph
+                copy_adjacency = copy_nodes = False
+        elif self.is_sparse_matrix(adjacency):
+            adjacency = self.convert_sparse_adjacency_matrix_to_list(adjacency)
+            copy_adjacency = False
+        elif len(adjacency):
             if not adjacency_type:
                 adjacency_type = self.get_adjacency_type(adjacency)
 
             if adjacency_type == 'matrix':
                 adjacency = self.convert_adjacency_matrix_to_list(adjacency)
+                copy_adjacency = False
+            elif isinstance(adjacency, np.ndarray):
+                # these columns are views onto the caller's array
+                adjacency = self.convert_numpy_edge_list(adjacency)
 
-        if adjacency or nodes or metadata:
+        # metadata passed in takes priority over the graph's
+        if graph_metadata:
+            metadata = dict(graph_metadata, **(metadata or {}))
+
+        if len(adjacency) or nodes or metadata:
             self.layers.append({
-                'edgeList': copy.deepcopy(adjacency),
-                'nodes': copy.deepcopy(nodes),
-                'metadata': copy.deepcopy(metadata),
+                'edgeList': self.copy_layer_data(adjacency, copy_adjacency),
+                'nodes': self.copy_layer_data(nodes, copy_nodes),
+                'metadata': self.copy_layer_data(metadata, copy),
             })
 
+    @staticmethod
+    def copy_layer_data(data, should_copy):
+        return copy.deepcopy(data) if should_copy else data
+
+    @staticmethod
+    def is_sparse_matrix(adjacency):
+        """scipy is optional; if `adjacency` is a scipy.sparse matrix then
+        scipy.sparse has already been imported"""
+        sparse = sys.modules.get('scipy.sparse')
+        return sparse is not None and sparse.issparse(adjacency)
+
+    @classmethod
+    def get_adjacency_size(cls, adjacency):
+        if cls.is_sparse_matrix(adjacency):
+            return adjacency.shape[0]
+
+        return len(adjacency)
+
     @staticmethod
     def get_adjacency_type(adjacency):
+        if isinstance(adjacency, EdgeList):
+            return 'list'
+
         if len(adjacency) and len(adjacency) > 3:
             # we use a dumb heuristic here:
             # if the length of the list is the same as the length of the first
@@ -367,6 +1122,9 @@ class Network(dict):
         return 'list'
 
     def convert_adjacency_matrix_to_list(self, matrix):
+        if isinstance(matrix, np.ndarray):
+            return self.convert_numpy_adjacency_matrix_to_list(matrix)
+
         edge_list = []
 
         # if the matrix is symmetric, only examine the upper triangular
@@ -387,6 +1145,84 @@ class Network(dict):
 
         return edge_list
 
+    @staticmethod
+    def convert_numpy_adjacency_matrix_to_list(matrix):
+        """converts an adjacency matrix held as a numpy array without
+        leaving numpy: one symmetry check and one `nonzero` pass.
+
+        returns an `EdgeList` of the same `[i, j, weight]` triples (in the
+        same order) as `convert_adjacency_matrix_to_list`"""
+        is_symmetric = np.array_equal(matrix, matrix.T)
+
+        rows, cols = np.nonzero(matrix)
+
+        return Network.get_edge_list_from_coordinates(
+            rows, cols, matrix[rows, cols], is_symmetric)
+
+    @staticmethod
+    def convert_sparse_adjacency_matrix_to_list(matrix):
+        """converts a scipy.sparse adjacency matrix using only its stored
+        entries, so memory scales with the number of nonzeros.
+
+        duplicate entries are summed and explicit zeros are dropped."""
+        matrix = matrix.tocsr(copy=True)
+        matrix.sum_duplicates()
+
+        is_symmetric = (matrix != matrix.T).nnz == 0
+
+        # canonical csr -> coo is in row major order, like `np.nonzero`
+        matrix = matrix.tocoo()
+        nonzero = matrix.data != 0
+
+        return Network.get_edge_list_from_coordinates(
+            matrix.row[nonzero],
+            matrix.col[nonzero],
+            matrix.data[nonzero],
+            is_symmetric,
+        )
+
+    @staticmethod
+    def get_edge_list_from_coordinates(rows, cols, weights, is_symmetric):
+        # if the matrix is symmetric, only keep the lower triangular
+        keep = rows > cols if is_symmetric else rows != cols
+
+        return EdgeList(rows[keep], cols[keep], weights[keep])
+
+    def get_edge_list_columns(self, adjacency, adjacency_type=None):
+        """returns an adjacency that isn't a table (see `add_layer`) as an
+        `EdgeList`, so that it can be read with a `node_table`"""
+        if self.is_sparse_matrix(adjacency):
+            adjacency = self.convert_sparse_adjacency_matrix_to_list(adjacency)
+        elif len(adjacency):
+            if not adjacency_type:
+                adjacency_type = self.get_adjacency_type(adjacency)
+
+            if adjacency_type == 'matrix':
+                adjacency = self.convert_adjacency_matrix_to_list(adjacency)
+            elif isinstance(adjacency, np.ndarray):
+                adjacency = self.convert_numpy_edge_list(adjacency)
+
+        if isinstance(adjacency, EdgeList):
+            return adjacency
+
+        weight = None
+        if any(len(edge) > 2 for edge in adjacency):
+            weight = [edge[2] if len(edge) > 2 else 1 for edge in adjacency]
+
+        return EdgeList(
+            [edge[0] for edge in adjacency],
+            [edge[1] for edge in adjacency],
+            weight,
+        )
+
+    @staticmethod
+    def convert_numpy_edge_list(edges):
+        """keeps (m, 2) and (m, 3) edge arrays columnar"""
+        if edges.ndim == 2 and edges.shape[1] in [2, 3]:
+            return EdgeList.from_array(edges)
+
+        return edges.tolist()
+
     @staticmethod
     def adjacency_matrix_is_symmetric(matrix):
         for i in range(len(matrix)):
@@ -395,6 +1231,279 @@ class Network(dict):
                     return False
         return True
 
+    @staticmethod
+    def get_columnar_layer(source, target, weight=None, names=None,
+                           attributes={}):
+        """builds a layer's columnar edges and vectorized metadata from edges
+        between node indexes.
+
+        parameters:
+        - `source`, `target`, `weight`: edge arrays. `source` and `target`
+          hold node indexes. weights that are all 1 are dropped
+        - `names`: sequence of node names, by index. its length is the number
+          of nodes
+        - `attributes`: dict of node attribute sequences, by index
+
+        the client numbers nodes by sorting their ids and gives vectorized
+        metadata to nodes in that order, adding nodes that aren't in any edge
+        after the rest. so nodes are renumbered here: nodes with edges come
+        first, then nodes without them, each in their original order.
+
+        returns (`EdgeList`, metadata, order), where `order[i]` is the original
+        index of the node that is now node `i`
+        """
+        source = np.asarray(source, dtype=np.int64)
+        target = np.asarray(target, dtype=np.int64)
+        node_count = len(names)
+
+        has_edges = np.zeros(node_count, dtype=bool)
+        has_edges[source] = True
+        has_edges[target] = True
+
+        order = np.concatenate(
+            [np.flatnonzero(has_edges), np.flatnonzero(~has_edges)])
+
+        new_index = np.empty(node_count, dtype=np.int64)
+        new_index[order] = np.arange(node_count)
+
+        if weight is not None and np.all(np.asarray(weight) == 1):
+            weight = None
+
+        edges = EdgeList(new_index[source], new_index[target], weight)
+
+        metadata = {}
+        for key, values in dict(attributes, name=names).items():
+            if isinstance(values, np.ndarray):
+                values = values[order]
+            else:
+                values = [values[i] for i in order.tolist()]
+
+            metadata[key] = {'values': values}
+
+        return edges, metadata, order
+
+    @classmethod
+    def get_columnar_layer_from_networkx_graph(cls, G):
+        """loads the edges and attributes from a networkx graph as a columnar
+        `EdgeList` and vectorized metadata, without modifying the graph.
+
+        node attributes that every node has become metadata; the rest are
+        returned as `nodes`.
+
+        returns (`EdgeList`, nodes, metadata), or None if the graph needs the
+        slower path (multigraphs, or weights that aren't numbers)
+        """
+        if G.is_multigraph():
+            return None
+
+        node_list = list(G)
+
+        try:
+            source, target, weight = cls.get_networkx_edge_columns(
+                G, node_list)
+        except (TypeError, ValueError):
+            return None
+
+        node_data = G.nodes
+        names = [node_data[node].get('name', node) for node in node_list]
+
+        key_counts = {}
+        for node in node_list:
+            for key in node_data[node]:
+                key_counts[key] = key_counts.get(key, 0) + 1
+
+        key_counts.pop('name', None)
+
+        attributes = {
+            key: [node_data[node][key] for node in node_list]
+            for key, count in key_counts.items() if count == len(node_list)
+        }
+
+        edges, metadata, order = cls.get_columnar_layer(
+            source, target, weight, names, attributes)
+
+        # attributes only some nodes have
+        nodes = {}
+        for i, node in enumerate(node_list[index] for index in order.tolist()):
+            for key, value in node_data[node].items():
+                if key not in attributes and key != 'name':
+                    nodes.setdefault(i, {})[key] = value
+
+        return edges, nodes, metadata
+
+    @staticmethod
+    def get_networkx_edge_columns(G, node_list):
+        """returns (source, target, weight) arrays of node indexes and weights.
+        a missing (or None) weight is 1.
+
+        (`networkx.to_scipy_sparse_array` walks the same edge view in python,
+        and doubles undirected edges on top of that, so it's slower than this)
+        """
+        index = {node: i for i, node in enumerate(node_list)}
+        edges = list(G.edges(data='weight', default=1))
+
+        source = np.fromiter((index[u] for u, _, _ in edges), dtype=np.int64,
+                             count=len(edges))
+        target = np.fromiter((index[v] for _, v, _ in edges), dtype=np.int64,
+                             count=len(edges))
+        weight = np.fromiter((1 if w is None else w for _, _, w in edges),
+                             dtype=float, count=len(edges))
+
+        return source, target, weight
+
+    @classmethod
+    def get_columnar_layer_from_igraph_graph(cls, G):
+        """loads the edges and vertex attributes of an igraph graph in bulk.
+        vertices are named by their `name` attribute, if they have one.
+
+        returns (`EdgeList`, nodes, metadata), like
+        `get_columnar_layer_from_networkx_graph`
+        """
+        edges = np.array(G.get_edgelist(), dtype=np.int64).reshape(-1, 2)
+
+        weight = None
+        if 'weight' in G.es.attributes():
+            weight = np.asarray(G.es['weight'])
+
+        attributes = {key: G.vs[key] for key in G.vs.attributes()}
+        names = attributes.pop('name', None) or list(range(G.vcount()))
+
+        edges, metadata, _ = cls.get_columnar_layer(
+            edges[:, 0], edges[:, 1], weight, names, attributes)
+
+        return edges, {}, metadata
+
+    @classmethod
+    def get_columnar_layer_from_graph_tool_graph(cls, G):
+        """loads the edges and vertex properties of a graph-tool graph in bulk.
+        vertices are named by their `name` property, if they have one.
+
+        returns (`EdgeList`, nodes, metadata), like
+        `get_columnar_layer_from_networkx_graph`
+
+        note: this is written against graph-tool's documented api, but has
+        only been tested with stand-ins for its graphs and property maps
+        (graph-tool can't be installed with pip, so `tests/graph_tool_test.py`
+        skips without it)
+        """
+        weight_property = G.edge_properties.get('weight')
+
+        if weight_property is None:
+            edges = G.get_edges()
+            weight = None
+        else:
+            edges = G.get_edges([weight_property])
+            weight = edges[:, 2]
+
+        attributes = {}
+        for key, values in G.vertex_properties.items():
+            array = values.get_array()
+
+            # properties that aren't scalars (strings, vectors) have no array
+            if array is None:
+                attributes[key] = [values[v] for v in G.vertices()]
+            else:
+                attributes[key] = np.array(array)
+
+        names = attributes.pop('name', None)
+        if names is None:
+            names = list(range(G.num_vertices()))
+
+        edges, metadata, _ = cls.get_columnar_layer(
+            edges[:, 0], edges[:, 1], weight, names, attributes)
+
+        return edges, {}, metadata
+
+    @staticmethod
+    def is_table(data):
+        """whether `data` is a pandas DataFrame or a pyarrow Table. neither
+        library is imported if it hasn't been already."""
+        pandas = sys.modules.get('pandas')
+        if pandas is not None and isinstance(data, pandas.DataFrame):
+            return True
+
+        pyarrow = sys.modules.get('pyarrow')
+        if pyarrow is not None and isinstance(data, pyarrow.Table):
+            return True
+
+        return False
+
+    @staticmethod
+    def get_table_column_names(table):
+        if hasattr(table, 'column_names'):
+            return list(table.column_names)
+
+        return list(table.columns)
+
+    @staticmethod
+    def get_table_column(table, name):
+        """returns a DataFrame's or Table's column as a numpy array"""
+        if hasattr(table, 'column_names'):
+            return table.column(name).to_numpy()
+
+        return table[name].to_numpy()
+
+    @classmethod
+    def get_columnar_layer_from_tables(cls, edge_table=None, node_table=None,
+                                       columns=None):
+        """loads the edges of an edge table and the node attributes of a node
+        table column by column (see `add_layer`'s `adjacency`, `node_table`
+        and `columns`). the edges can also be an `EdgeList`.
+
+        nodes are named by their ids, and the node table's other columns
+        become vectorized metadata. nodes in the edges but not in the node
+        table have `None` for those.
+
+        returns (`EdgeList`, metadata)
+        """
+        columns = dict(
+            {'source': 'source', 'target': 'target', 'weight': 'weight',
+             'id': 'id'},
+            **(columns or {})
+        )
+
+        source = target = weight = np.empty(0, dtype=np.int64)
+        if cls.is_table(edge_table):
+            source = cls.get_table_column(edge_table, columns['source'])
+            target = cls.get_table_column(edge_table, columns['target'])
+
+            if columns['weight'] in cls.get_table_column_names(edge_table):
+                weight = cls.get_table_column(edge_table, columns['weight'])
+            else:
+                weight = None
+        elif isinstance(edge_table, EdgeList) and len(edge_table):
+            source, target, weight = (
+                edge_table.source, edge_table.target, edge_table.weight)
+
+        ids = np.empty(0, dtype=source.dtype)
+        node_columns = {}
+        if node_table is not None:
+            for name in cls.get_table_column_names(node_table):
+                node_columns[name] = cls.get_table_column(node_table, name)
+
+            ids = node_columns.pop(columns['id'], None)
+            if ids is None:
+                ids = np.arange(len(node_table))
+
+        # number the nodes of both tables together
+        names, indexes = np.unique(
+            np.concatenate([ids, source, target]), return_inverse=True)
+
+        node_indexes = indexes[:len(ids)]
+        source = indexes[len(ids):len(ids) + len(source)]
+        target = indexes[len(ids) + len(source):]
+
+        attributes = {}
+        for name, values in node_columns.items():
+            attribute = np.full(len(names), None, dtype=object)
+            attribute[node_indexes] = values
+            attributes[name] = attribute.tolist()
+
+        edges, metadata, _ = cls.get_columnar_layer(
+            source, target, weight, names.tolist(), attributes)
+
+        return edges, metadata
+
     @staticmethod
     def get_adjacency_and_nodes_from_networkx_graph(G):
         """loads the edges and attributes from a networkx graph"""
@@ -406,7 +1515,8 @@ class Network(dict):
                 edge.append(d['weight'])
             adj.append(edge)
 
-        nodes = {node: G.nodes[node] for node in G.nodes}
+        # copied, so that naming nodes doesn't change the graph
+        nodes = {node: dict(G.nodes[node]) for node in G.nodes}
 
         for node, metadata in nodes.items():
             nodes[node]['name'] = metadata.get('name', node)
@@ -425,49 +1535,680 @@ class Network(dict):
 
         return str(name)
 
+    def read_graphs_from_gml(self, gml_file, workers=1):
+        """yields (adjacency, nodes) for each graph in a gml file, in order,
+        reading the file one node or edge at a time.
+
+        if `workers` isn't 1, the file is split into its graphs, which are read
+        in a pool of `workers` processes (None uses a process per cpu)
+        """
+        if workers != 1:
+            spans = pygmlion.get_graph_spans(gml_file)
+
+            if len(spans) > 1:
+                starts, ends = zip(*spans)
+
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    yield from executor.map(
+                        self.read_gml_graph_span,
+                        itertools.repeat(gml_file),
+                        starts,
+                        ends,
+                    )
+
+                return
+
+        for _, elements in pygmlion.iter_gml_graphs(gml_file):
+            yield self.read_graph_from_gml(elements)
+
+    @staticmethod
+    def read_gml_graph_span(gml_file, start, end):
+        """reads the graph between byte offsets `start` and `end` of a gml file
+        (see `pygmlion.get_graph_spans`)"""
+        with open(gml_file, 'rb') as f:
+            f.seek(start)
+            gml = f.read(end - start)
+
+        for _, elements in pygmlion.iter_gml_graphs(gml):
+            return Network().read_graph_from_gml(elements)
+
     def read_graph_from_gml(self, gml):
-        gml_nodes = gml.get('node', [])
-        node_ids = {n.get('id') for n in gml_nodes}
+        """returns (adjacency, nodes) for a gml graph.
+
+        `gml` is either a graph dict from `pygmlion.get_gml` or an iterable of
+        a graph's events from `pygmlion.iter_gml`
+        """
+        if isinstance(gml, dict):
+            gml = itertools.chain(
+                (('node', node) for node in gml.get('node', [])),
+                (('edge', edge) for edge in gml.get('edge', [])),
+            )
 
-        unused_node_id = max(list(node_ids)) + 1
         nodes = {}
-        for node in gml_nodes:
-            # try to find a name
-            _id = node.get('id', None)
+        nodes_without_ids = []
+        adjacency = []
+        for kind, value in gml:
+            if kind == 'node':
+                _id = value.get('id', None)
 
-            if _id is None:
-                _id = unused_node_id
-                unused_node_id += 1
+                if _id is None:
+                    nodes_without_ids.append(value)
+                else:
+                    nodes[_id] = self.read_node_from_gml(value, _id)
+            elif kind == 'edge':
+                edge = self.read_edge_from_gml(value)
 
-            nodes[_id] = {
-                'name': self.get_name_from_gml_object(node, default=_id)
+                if edge:
+                    adjacency.append(edge)
+
+        # nodes without ids are given ids that aren't used
+        unused_node_id = max(nodes, default=-1) + 1
+        for node in nodes_without_ids:
+            nodes[unused_node_id] = self.read_node_from_gml(node,
+                                                            unused_node_id)
+            unused_node_id += 1
+
+        return adjacency, nodes
+
+    def read_node_from_gml(self, node, _id):
+        attributes = {
+            'name': self.get_name_from_gml_object(node, default=_id)
+        }
+
+        for key, value in node.items():
+            # this currently doesn't do graphical attributes like `x` and `y`
+            if type(value) in [str, float, int]:
+                if key not in ['id', 'label']:
+                    attributes[key] = value
+            elif key == 'graphics':
+                for subvalue in value:
+                    if type(subvalue) == dict:
+                        for subkey, subsubvalue in subvalue.items():
+                            if subkey in ['x', 'y']:
+                                attributes[subkey] = subsubvalue
+
+        return attributes
+
+    @staticmethod
+    def read_edge_from_gml(edge):
+        source = edge.get('source')
+        target = edge.get('target')
+
+        if source is not None and target is not None:
+            _edge = [source, target]
+
+            weight = edge.get('weight')
+
+            if weight:
+                _edge.append(weight)
+
+            return _edge
+
+    def to_gml(self, path, label=None):
+        """writes the network's layers to `path` (a path or a text file object)
+        as gml, one graph per layer, as they're read.
+
+        every node the client would show is written, including nodes that are
+        only in the edge list or only counted by `metadata`. if any node isn't
+        an integer, nodes are numbered in order and labeled with their
+        original key. each node's vectorized `metadata` values are written as
+        its attributes (with categories in place of their indexes), and then
+        its `nodes` attributes. attributes that are `None` or NaN are skipped,
+        and lists are written as their values, each under the list's key.
+
+        parameters:
+        - `path`: string. path of the gml file
+        - `label`: string. if given, each graph's `label`
+        """
+        pygmlion.write_gml(self.iter_gml_graphs(label), path)
+
+    def iter_gml_graphs(self, label=None):
+        """yields ('graph', entries) for each layer, for `pygmlion.write_gml`"""
+        for layer in self.layers:
+            yield 'graph', self.iter_layer_gml(layer, label)
+
+    def iter_layer_gml(self, layer, label=None):
+        """yields the (key, value) attributes of a layer's gml graph. nodes and
+        edges are yielded as they're written, straight from `edgeList`,
+        `nodes` and `metadata`"""
+        if label is not None:
+            yield 'label', label
+
+        edges = layer['edgeList']
+        nodes = {
+            self.get_client_node_name(key): attributes
+            for key, attributes in (layer['nodes'] or {}).items()
+        }
+
+        # the nodes the client shows, in its order, so that the `i`th
+        # metadata value is the `i`th node's
+        names = self.get_layer_node_indexes(layer)[0]
+        metadata = self.get_gml_metadata_values(layer.get('metadata'))
+
+        if all(self.is_gml_id(name) for name in names):
+            ids = None
+        else:
+            ids = {name: i for i, name in enumerate(names)}
+
+        for i, name in enumerate(names):
+            node = [('id', name if ids is None else ids[name])]
+
+            if ids is not None:
+                node.append(('label', str(name)))
+
+            attributes = {
+                key: values[i] for key, values in metadata.items()
+                if i < len(values)
             }
+            attributes.update(nodes.get(name) or {})
 
-            for key, value in node.items():
-                # this currently doesn't do graphical attributes like `x` and `y`
-                if type(value) in [str, float, int]:
-                    if key not in ['id', 'label']:
-                        nodes[_id][key] = value
-                elif key == 'graphics':
-                    for subvalue in value:
-                        if type(subvalue) == dict:
-                            for subkey, subsubvalue in subvalue.items():
-                                if subkey in ['x', 'y']:
-                                    nodes[_id][subkey] = subsubvalue
+            for attribute, value in attributes.items():
+                if attribute == 'id' or value is None:
+                    continue
 
-        adjacency = []
-        for edge in gml.get('edge', []):
-            source = edge.get('source')
-            target = edge.get('target')
+                if isinstance(value, float) and not math.isfinite(value):
+                    continue
 
-            if source and target:
-                _edge = [source, target]
+                # gml writes a list as its values, each under the list's key
+                if isinstance(value, (list, tuple, np.ndarray)):
+                    node.extend((attribute, item) for item in value)
+                else:
+                    node.append((attribute, value))
 
-                weight = edge.get('weight')
+            yield 'node', node
 
-                if weight:
-                    _edge.append(weight)
+        # an EdgeList converts its columns to python a chunk at a time
+        for edge in edges:
+            source, target = edge[0], edge[1]
 
-                adjacency.append(_edge)
+            if ids is not None or not isinstance(edges, EdgeList):
+                source = self.get_client_node_name(source)
+                target = self.get_client_node_name(target)
 
-        return adjacency, nodes
+            if ids is not None:
+                source, target = ids[source], ids[target]
+
+            gml_edge = [('source', source), ('target', target)]
+
+            if len(edge) > 2:
+                gml_edge.append(('weight', edge[2]))
+
+            yield 'edge', gml_edge
+
+    @staticmethod
+    def get_gml_metadata_values(metadata):
+        """returns a dict of each vectorized metadatum's key to its list of
+        values. categorical values are replaced with their categories"""
+        values = {}
+        for key, metadatum in (metadata or {}).items():
+            if not isinstance(metadatum, dict):
+                continue
+
+            metadatum_values = metadatum.get('values')
+            if metadatum_values is None:
+                continue
+
+            if isinstance(metadatum_values, np.ndarray):
+                metadatum_values = metadatum_values.tolist()
+
+            categories = metadatum.get('categories')
+            if categories:
+                metadatum_values = [
+                    categories[value] if isinstance(value, int) and
+                    0 <= value < len(categories) else value
+                    for value in metadatum_values
+                ]
+
+            values[key] = metadatum_values
+
+        return values
+
+    @staticmethod
+    def is_gml_id(key):
+        return isinstance(key, (int, np.integer)) and not isinstance(key, bool)
+
+    def compute_layout(self, display=None, cache=None, warm_start=False,
+                       **parameters):
+        """computes where the nodes of each layer go, with `forcelayout`, and
+        stores them as the `x` and `y` of the layer's `nodes`. the client
+        draws these layers at those positions, with node movement frozen,
+        instead of running its own simulation.
+
+        parameters:
+        - `display`: dict of display parameters. default is None. The layout
+          uses its `c`, `g`, `l` and `linkStrength` (or `charge`, `gravity`
+          and `linkLength`), and counts the nodes in its `nodes` and
+          `metadata` like the client does
+        - `cache`: default is None. If True, layouts are read from (and saved
+          to) the default `forcelayout.LayoutCache`; a `LayoutCache` is used
+          instead of it. Otherwise, layouts aren't cached
+        - `warm_start`: boolean. default is False. If True, each layer's
+          layout starts from the previous layer's, so that nodes stay put
+          from layer to layer. The client then moves nodes smoothly between
+          layers instead of jumping
+        - `parameters`: passed to `forcelayout.get_layout`. these take
+          priority over `display`
+        """
+        for layer, names, positions in self.iter_layer_layouts(
+                display, cache, warm_start, **parameters):
+            self.set_layer_positions(layer, names, positions)
+
+    def iter_layer_layouts(self, display=None, cache=None, warm_start=False,
+                           **parameters):
+        """lays out each layer without changing it. see `compute_layout`.
+
+        yields (layer, names, positions), where `positions[i]` is the position
+        of the node named `names[i]`
+        """
+        # one cache for every layer, so that it only counts its size once
+        cache = forcelayout.get_layout_cache(cache)
+
+        previous = None
+        for layer in self.layers:
+            names, positions = self.get_layer_layout(
+                layer, display, cache, previous, **parameters)
+
+            if warm_start:
+                previous = self.get_node_identities(layer, names), positions
+
+            yield layer, names, positions
+
+    def get_layer_layout(self, layer, display=None, cache=None, previous=None,
+                         **parameters):
+        """lays out a layer without changing it. see `compute_layout`.
+
+        parameters:
+        - `previous`: (identities, positions) of a layout to start from, where
+          the identities are from `get_node_identities`. default is None.
+          Nodes that aren't in it start next to their neighbors
+
+        returns (names, positions)
+        """
+        display = display or {}
+
+        parameters = dict(forcelayout.get_display_parameters(display),
+                          **parameters)
+
+        names, source, target, weight = self.get_layer_node_indexes(
+            layer, display)
+
+        if previous is not None:
+            parameters.setdefault('alpha', forcelayout.WARM_START_ALPHA)
+            parameters['positions'] = self.get_starting_positions(
+                self.get_node_identities(layer, names), *previous)
+
+        cache = forcelayout.get_layout_cache(cache)
+
+        if cache:
+            positions = cache.get_layout(
+                source, target, len(names), weight, names=names, **parameters)
+        else:
+            positions = forcelayout.get_layout(
+                source, target, len(names), weight, **parameters)
+
+        return names, positions
+
+    @staticmethod
+    def get_node_identities(layer, names):
+        """returns what identifies the nodes in `names` from one layer to the
+        next.
+
+        layers read from graph objects and tables number their nodes from 0
+        in each graph, and keep the nodes' names in their `name` metadata.
+        if the layer has a different `name` value for each node, those are
+        used; otherwise, the nodes' names are.
+        """
+        values = ((layer.get('metadata') or {}).get('name') or {}).get('values')
+
+        if values is None or len(values) != len(names):
+            return names
+
+        if isinstance(values, np.ndarray):
+            values = values.tolist()
+
+        try:
+            if len(set(values)) == len(names):
+                return list(values)
+        except TypeError:
+            pass
+
+        return names
+
+    @staticmethod
+    def get_starting_positions(identities, previous_identities,
+                               previous_positions):
+        """returns the positions in a previous layout of the nodes in
+        `identities`. nodes that weren't in it are NaN"""
+        previous_index = dict(zip(previous_identities, itertools.count()))
+
+        positions = np.full((len(identities), 2), np.nan)
+        for i, identity in enumerate(identities):
+            j = previous_index.get(identity)
+
+            if j is not None:
+                positions[i] = previous_positions[j]
+
+        return positions
+
+    @staticmethod
+    def set_layer_positions(layer, names, positions):
+        """sets the `x` and `y` of each node in `names` in the layer's
+        `nodes`. the layer's node attribute dicts are copied, not modified"""
+        nodes = layer.get('nodes') or {}
+        keys = {Network.get_client_node_name(key): key for key in nodes}
+
+        positioned = {key: dict(attributes) for key, attributes in nodes.items()}
+        for name, (x, y) in zip(names, np.round(positions, 2).tolist()):
+            positioned.setdefault(keys.get(name, name), {}).update(x=x, y=y)
+
+        layer['nodes'] = positioned
+        layer['precomputedLayout'] = True
+
+    @classmethod
+    def get_layer_node_indexes(cls, layer, display={}):
+        """numbers the nodes the client will find in a layer: those in its
+        edges, in `display` and layer `nodes`, and any more that vectorized
+        `metadata` has values for.
+
+        returns (names, source, target, weight), where `source` and `target`
+        are edges as indexes into the list of node `names`
+        """
+        edges = layer.get('edgeList')
+        if edges is None:
+            edges = []
+
+        if isinstance(edges, EdgeList) and all(
+                column.dtype.kind in 'iu' for column in edges.columns[:2]):
+            names, endpoints = np.unique(
+                np.concatenate([edges.source, edges.target]),
+                return_inverse=True)
+
+            index = dict(zip(names.tolist(), itertools.count()))
+            source, target = np.split(endpoints.ravel(), 2)
+            weight = edges.weight
+        else:
+            index = {}
+            endpoints = [
+                index.setdefault(
+                    cls.get_client_node_name(edge[i]), len(index))
+                for edge in edges for i in range(2)
+            ]
+
+            source, target = endpoints[0::2], endpoints[1::2]
+            weight = [float(edge[2]) if len(edge) > 2 else 1 for edge in edges]
+
+        for nodes in [display.get('nodes'), layer.get('nodes')]:
+            for key in (nodes or {}):
+                index.setdefault(cls.get_client_node_name(key), len(index))
+
+        # the client sorts nodes whose names are all integers
+        names = list(index)
+        if all(isinstance(name, int) and not isinstance(name, bool)
+               for name in names) and names != sorted(names):
+            names.sort()
+            order = np.empty(len(names), dtype=np.int64)
+            order[[index[name] for name in names]] = np.arange(len(names))
+
+            index = dict(zip(names, itertools.count()))
+            source = order[np.asarray(source, dtype=np.int64)]
+            target = order[np.asarray(target, dtype=np.int64)]
+
+        node_count = max(
+            cls.get_metadata_values_count(display.get('metadata')),
+            cls.get_metadata_values_count(layer.get('metadata')),
+        )
+
+        if node_count > len(index):
+            unused_name = 1 + max(
+                (name for name in index if isinstance(name, int)), default=-1)
+
+            for name in range(unused_name,
+                              unused_name + node_count - len(index)):
+                index[name] = len(index)
+
+        return list(index), source, target, weight
+
+    @staticmethod
+    def get_client_node_name(name):
+        """the client reads node names that look like numbers as numbers"""
+        if isinstance(name, np.generic):
+            name = name.item()
+
+        if isinstance(name, str):
+            try:
+                number = float(name)
+            except ValueError:
+                return name
+
+            if not np.isfinite(number):
+                return name
+
+            name = number
+
+        if isinstance(name, float) and name.is_integer():
+            return int(name)
+
+        return name
+
+    def get_layer_delta(self, previous, layer, display={}):
+        """encodes `layer` as the changes from `previous` to it:
+        - `edgeList`: the edges to `remove` (each removes its first match) and
+          those to `add` after the rest
+        - `nodes`: the node attributes to `set` (and nodes to add), the
+          attributes to `unset`, and the nodes to `remove`
+        - `metadata`: the metadata to `set` and the keys to `remove`
+
+        the other keys of the layer are kept, and `nodeCount` is added so the
+        client knows how many nodes the layer has before rebuilding it.
+
+        returns the delta layer, or None if it wouldn't be smaller than the
+        layer or (when nodes aren't all named with integers, so their order
+        matters) the client wouldn't rebuild the edges and nodes in order
+        """
+        previous_edges = self.get_edge_tuples(previous.get('edgeList'))
+        edges = self.get_edge_tuples(layer.get('edgeList'))
+
+        removed = Counter(previous_edges) - Counter(edges)
+        added = Counter(edges) - Counter(previous_edges)
+
+        if sum(removed.values()) + sum(added.values()) >= len(edges):
+            return None
+
+        names = self.get_layer_node_indexes(layer, display)[0]
+        order_matters = not all(
+            isinstance(name, int) and not isinstance(name, bool)
+            for name in names)
+
+        kept = self.remove_edges(previous_edges, removed)
+
+        if edges[:len(kept)] == kept:
+            add = edges[len(kept):]
+        elif not order_matters:
+            add = list(added.elements())
+        else:
+            return None
+
+        nodes_delta = self.get_nodes_delta(
+            previous.get('nodes') or {}, layer.get('nodes') or {},
+            order_matters)
+
+        if nodes_delta is None:
+            return None
+
+        delta_layer = {
+            key: value for key, value in layer.items()
+            if key not in ['edgeList', 'nodes', 'metadata']
+        }
+
+        delta_layer['delta'] = {
+            'edgeList': {
+                'add': [list(edge) for edge in add],
+                'remove': [list(edge) for edge in removed.elements()],
+            },
+            'nodes': nodes_delta,
+            'metadata': self.get_metadata_delta(
+                previous.get('metadata') or {}, layer.get('metadata') or {}),
+        }
+        delta_layer['nodeCount'] = len(names)
+
+        return delta_layer
+
+    @staticmethod
+    def get_edge_tuples(edges):
+        if edges is None:
+            return []
+
+        if isinstance(edges, EdgeList):
+            edges = edges.tolist()
+
+        return [tuple(edge) for edge in edges]
+
+    @staticmethod
+    def remove_edges(edges, removed):
+        """removes the first occurrences of the edges in the Counter
+        `removed`, as the client does"""
+        removed = Counter(removed)
+
+        kept = []
+        for edge in edges:
+            if removed[edge]:
+                removed[edge] -= 1
+            else:
+                kept.append(edge)
+
+        return kept
+
+    @classmethod
+    def get_nodes_delta(cls, previous, nodes, order_matters=False):
+        """returns the changes from the `previous` nodes dict to `nodes`, or
+        None if order matters and the client's would come out differently"""
+        delta = {'set': {}, 'unset': {}, 'remove': []}
+
+        for key in previous:
+            if key not in nodes:
+                delta['remove'].append(key)
+
+        for key, attributes in nodes.items():
+            previous_attributes = previous.get(key, {})
+
+            changed = {
+                attribute: value for attribute, value in attributes.items()
+                if attribute not in previous_attributes or not
+                cls.values_are_equal(previous_attributes[attribute], value)
+            }
+
+            if changed or key not in previous:
+                delta['set'][key] = changed
+
+            unset = [
+                attribute for attribute in previous_attributes
+                if attribute not in attributes
+            ]
+
+            if unset:
+                delta['unset'][key] = unset
+
+        if order_matters:
+            rebuilt = [key for key in previous if key in nodes]
+            rebuilt += [key for key in nodes if key not in previous]
+
+            if rebuilt != list(nodes):
+                return None
+
+        return {key: value for key, value in delta.items() if value}
+
+    @classmethod
+    def get_metadata_delta(cls, previous, metadata):
+        delta = {
+            'set': {
+                key: metadatum for key, metadatum in metadata.items()
+                if key not in previous or not
+                cls.values_are_equal(previous[key], metadatum)
+            },
+            'remove': [key for key in previous if key not in metadata],
+        }
+
+        return {key: value for key, value in delta.items() if value}
+
+    @classmethod
+    def values_are_equal(cls, a, b):
+        """compares values as their json would be, including dicts and lists
+        that hold numpy arrays"""
+        if isinstance(a, bool) != isinstance(b, bool):
+            return False
+
+        if isinstance(a, dict) and isinstance(b, dict):
+            return a.keys() == b.keys() and all(
+                cls.values_are_equal(a[key], b[key]) for key in a)
+
+        try:
+            return bool(a == b)
+        except (TypeError, ValueError):
+            return np.array_equal(a, b)
+
+    @staticmethod
+    def get_metadata_values_count(metadata):
+        return max(
+            (len(metadatum['values']) for metadatum in (metadata or {}).values()
+             if metadatum.get('values') is not None),
+            default=0,
+        )
+
+
+class EdgeList(Sequence):
+    """a columnar edge list.
+
+    edges are held as `source`, `target` and (optionally) `weight` numpy
+    arrays instead of a list of python lists. It behaves like the (read only)
+    list of `[source, target]` or `[source, target, weight]` lists it stands
+    in for, and serializes to the same json.
+    """
+
+    def __init__(self, source, target, weight=None):
+        self.source = np.asarray(source)
+        self.target = np.asarray(target)
+        self.weight = None if weight is None else np.asarray(weight)
+
+    @classmethod
+    def from_array(cls, edges):
+        """makes an EdgeList from an (m, 2) or (m, 3) array of edges"""
+        edges = np.asarray(edges)
+        weight = edges[:, 2] if edges.shape[1] == 3 else None
+        return cls(edges[:, 0], edges[:, 1], weight)
+
+    @property
+    def columns(self):
+        if self.weight is None:
+            return [self.source, self.target]
+
+        return [self.source, self.target, self.weight]
+
+    def __len__(self):
+        return len(self.source)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return EdgeList(*[column[index] for column in self.columns])
+
+        return [column[index].item() for column in self.columns]
+
+    def __iter__(self, chunk_size=10000):
+        for start in range(0, len(self), chunk_size):
+            yield from self[start:start + chunk_size].tolist()
+
+    def __eq__(self, other):
+        if isinstance(other, EdgeList):
+            other = other.tolist()
+
+        return self.tolist() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "EdgeList({} edges, {})".format(
+            len(self), 'weighted' if self.weight is not None else 'unweighted')
+
+    def tolist(self):
+        """returns the edges as a list of lists of python scalars"""
+        return [list(edge) for edge in
+                zip(*[column.tolist() for column in self.columns])]